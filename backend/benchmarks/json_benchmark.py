@@ -0,0 +1,92 @@
+"""
+Benchmark: JSON encode time of the stdlib JSONResponse versus the orjson-backed
+FastJSONResponse, for the seeded data set and a synthetic 10k-project list.
+
+Usage: python benchmarks/json_benchmark.py [--projects N] [--iterations N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from json_encoding import FastJSONResponse, orjson
+from models import Project, Experience, TechnicalExpertise
+from routes.portfolio import router
+from seed_database import PROJECTS_DATA, EXPERIENCE_DATA, TECHNICAL_EXPERTISE_DATA
+
+
+def response_field(path):
+    for route in router.routes:
+        if route.path == f"{router.prefix}{path}":
+            return route.response_field
+    raise KeyError(path)
+
+
+def synthetic_projects(count):
+    created = datetime(2024, 1, 1)
+    projects = []
+    for i in range(count):
+        template = PROJECTS_DATA[i % len(PROJECTS_DATA)]
+        projects.append(Project(**{
+            **template,
+            "id": f"{template['id']}-{i}",
+            "created_at": created + timedelta(minutes=i),
+        }))
+    return projects
+
+
+def best_of(fn, iterations, repeat=3):
+    """Best average wall time in milliseconds over a few repeats"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        best = min(best, (time.perf_counter() - start) / iterations * 1000)
+    return best
+
+
+async def main(project_count, iterations):
+    if orjson is None:
+        print("orjson is not installed; FastJSONResponse falls back to the stdlib encoder\n")
+
+    cases = [
+        ("seed projects", "/projects", [Project(**doc) for doc in PROJECTS_DATA]),
+        ("seed experience", "/experience", [Experience(**doc) for doc in EXPERIENCE_DATA]),
+        ("seed expertise", "/expertise", [TechnicalExpertise(**doc) for doc in TECHNICAL_EXPERTISE_DATA]),
+        (f"synthetic {project_count} projects", "/projects", synthetic_projects(project_count)),
+    ]
+
+    print(f"{'data set':<26}{'bytes':>10}{'stdlib ms':>12}{'fast ms':>10}{'speedup':>9}")
+    for label, path, data in cases:
+        # What the response class receives after FastAPI's response_model pass
+        content = await serialize_response(field=response_field(path), response_content=data)
+        stdlib_body = JSONResponse(content).body
+        assert FastJSONResponse(content).body == stdlib_body
+
+        runs = max(1, iterations // max(1, len(data) // 10))
+        stdlib_ms = best_of(lambda: JSONResponse(content), runs)
+        fast_ms = best_of(lambda: FastJSONResponse(content), runs)
+        print(
+            f"{label:<26}{len(stdlib_body):>10}{stdlib_ms:>12.3f}{fast_ms:>10.3f}"
+            f"{stdlib_ms / fast_ms:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=10000, help="size of the synthetic project list")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.projects, args.iterations))
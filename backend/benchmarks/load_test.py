@@ -0,0 +1,289 @@
+"""
+Concurrent load test for every route in server.py, driven in-process through
+the ASGI app against an in-memory Mongo stand-in (or a real MONGO_URL).
+
+Usage:
+    python benchmarks/load_test.py --concurrency 32 --duration 10
+    python benchmarks/load_test.py --mix projects=10,contact_create=1 --output run.json
+    python benchmarks/load_test.py --baseline previous.json --max-regression 20
+
+Requires httpx, plus mongomock-motor for the default --mongo=mock mode.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+# Every simulated client shares one address, so throttling would skew the run
+os.environ.setdefault('CONTACT_RATE_LIMIT_ENABLED', 'false')
+
+COLLECTIONS = [
+    "contact_messages", "projects", "experiences", "technical_expertise",
+    "portfolio_meta", "contact_outbox",
+]
+
+PROJECT_ID = "telus-faq-optimization"
+
+# name -> (weight, method, path, json body); {message_id} is filled in at runtime,
+# and {n} in body strings with a per-request counter
+DEFAULT_MIX = {
+    "root": (1, "GET", "/api/", None),
+    "health": (2, "GET", "/api/health", None),
+    "metrics": (1, "GET", "/api/metrics", None),
+    "projects": (20, "GET", "/api/portfolio/projects", None),
+    "projects_summary": (10, "GET", "/api/portfolio/projects?fields=summary", None),
+    "projects_category": (5, "GET", "/api/portfolio/projects?category=Conversational%20AI", None),
+    "project_detail": (10, "GET", f"/api/portfolio/projects/{PROJECT_ID}", None),
+    "experience": (15, "GET", "/api/portfolio/experience", None),
+    "expertise": (15, "GET", "/api/portfolio/expertise", None),
+    "stats": (10, "GET", "/api/portfolio/stats", None),
+    "bundle": (10, "GET", "/api/portfolio/bundle?fields=summary", None),
+    "search": (5, "GET", "/api/portfolio/search?q=dialogflow", None),
+    "cache_stats": (1, "GET", "/api/portfolio/cache/stats", None),
+    "contact_create": (3, "POST", "/api/contact/", {
+        "name": "Load Test",
+        # Unique per request, otherwise every POST after the first one only
+        # measures the duplicate-replay path
+        "email": "load.test.{n}@example.com",
+        "subject": "Load test message {n}",
+        "message": "Generated by benchmarks/load_test.py, request {n}",
+    }),
+    "contact_list": (2, "GET", "/api/contact/?limit=20", None),
+    "contact_inbox": (2, "GET", "/api/contact/inbox?limit=20", None),
+    "contact_export": (1, "GET", "/api/contact/export?batch_size=100", None),
+    "contact_detail": (2, "GET", "/api/contact/{message_id}", None),
+    "contact_status": (1, "PATCH", "/api/contact/{message_id}/status?status=read", None),
+}
+
+
+def use_mongo_stand_in():
+    """Point the database module at an in-memory client before routes import it"""
+    try:
+        import mongomock_motor
+    except ImportError:
+        sys.exit("mongomock-motor is required for --mongo=mock (pip install mongomock-motor)")
+
+    import database
+    client = mongomock_motor.AsyncMongoMockClient()
+    db = client[os.environ.get('DB_NAME', 'portfolio_db')]
+    database.client = client
+    database.db = db
+    for name in COLLECTIONS:
+        if hasattr(database, name):
+            setattr(database, name, db[name])
+
+
+def request_body(body, counter):
+    """Fill the {n} placeholders of a JSON body with the next counter value"""
+    if body is None:
+        return None
+    n = next(counter)
+    return {key: value.format(n=n) if isinstance(value, str) else value for key, value in body.items()}
+
+
+def parse_mix(value):
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            sys.exit(f"Unknown route '{name}'. Choose from: {', '.join(DEFAULT_MIX)}")
+        _, method, path, body = DEFAULT_MIX[name]
+        mix[name] = (float(weight or 1), method, path, body)
+    return mix
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies, statuses, elapsed):
+    routes = {}
+    for name in sorted(latencies):
+        values = sorted(latencies[name])
+        routes[name] = {
+            "requests": len(values),
+            "throughput_rps": round(len(values) / elapsed, 1),
+            "mean_ms": round(sum(values) / len(values), 3),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "p99_ms": round(percentile(values, 99), 3),
+            "max_ms": round(values[-1], 3),
+            "statuses": statuses[name],
+            "errors": sum(count for code, count in statuses[name].items() if int(code) >= 500),
+        }
+    all_values = sorted(v for values in latencies.values() for v in values)
+    total = {
+        "requests": len(all_values),
+        "throughput_rps": round(len(all_values) / elapsed, 1),
+        "p50_ms": round(percentile(all_values, 50), 3),
+        "p95_ms": round(percentile(all_values, 95), 3),
+        "p99_ms": round(percentile(all_values, 99), 3),
+        "errors": sum(route["errors"] for route in routes.values()),
+    }
+    return routes, total
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=backend_path, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def print_report(routes, total):
+    print(f"{'route':<20}{'reqs':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, route in routes.items():
+        print(
+            f"{name:<20}{route['requests']:>8}{route['throughput_rps']:>10}"
+            f"{route['p50_ms']:>10}{route['p95_ms']:>10}{route['p99_ms']:>10}{route['errors']:>8}"
+        )
+    print(
+        f"{'TOTAL':<20}{total['requests']:>8}{total['throughput_rps']:>10}"
+        f"{total['p50_ms']:>10}{total['p95_ms']:>10}{total['p99_ms']:>10}{total['errors']:>8}"
+    )
+
+
+def compare(routes, baseline_path, max_regression):
+    """Print p95 deltas against a previous run and return the regressed routes"""
+    baseline = json.loads(Path(baseline_path).read_text())["routes"]
+    regressed = []
+    print(f"\nComparison with {baseline_path} (p95)")
+    for name, route in routes.items():
+        before = baseline.get(name)
+        if not before or not before["p95_ms"]:
+            continue
+        change = (route["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        flag = ""
+        if change > max_regression:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"  {name:<20}{before['p95_ms']:>10} -> {route['p95_ms']:<10}{change:+.1f}%{flag}")
+    return regressed
+
+
+async def run(args):
+    import httpx
+    import seed_database
+    from server import app
+
+    # Per-request client logging would dominate the measured time
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    mix = parse_mix(args.mix)
+    names = list(mix)
+    weights = [mix[name][0] for name in names]
+    rng = random.Random(args.seed)
+
+    latencies = {name: [] for name in names}
+    statuses = {name: {} for name in names}
+    counter = itertools.count()
+
+    # Seed before startup so the search index and caches are built from the data
+    if args.seed_data:
+        await seed_database.seed_database()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            created = await client.post(
+                "/api/contact/", json=request_body(DEFAULT_MIX["contact_create"][3], counter)
+            )
+            created.raise_for_status()
+            message_id = created.json()["id"]
+
+            # Warm caches so the measured window reflects steady state
+            for name in names:
+                _, method, path, body = mix[name]
+                await client.request(
+                    method, path.format(message_id=message_id), json=request_body(body, counter)
+                )
+
+            deadline = time.perf_counter() + args.duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    name = rng.choices(names, weights)[0]
+                    _, method, path, body = mix[name]
+                    started = time.perf_counter()
+                    response = await client.request(
+                        method, path.format(message_id=message_id), json=request_body(body, counter)
+                    )
+                    latencies[name].append((time.perf_counter() - started) * 1000)
+                    code = str(response.status_code)
+                    statuses[name][code] = statuses[name].get(code, 0) + 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+    latencies = {name: values for name, values in latencies.items() if values}
+    return summarize(latencies, statuses, elapsed), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent in-process load test for the portfolio API")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent client tasks")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured window in seconds")
+    parser.add_argument("--mix", help=f"comma list of route=weight from: {', '.join(DEFAULT_MIX)}")
+    parser.add_argument("--mongo", choices=["mock", "url"], default="mock",
+                        help="in-memory stand-in, or the server configured by MONGO_URL")
+    parser.add_argument("--no-seed", dest="seed_data", action="store_false",
+                        help="do not (re)seed portfolio data before the run")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the request mix")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against a previous JSON result")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="p95 increase in percent that fails the comparison")
+    args = parser.parse_args()
+
+    if args.mongo == "mock":
+        use_mongo_stand_in()
+
+    (routes, total), elapsed = asyncio.run(run(args))
+    print()
+    print_report(routes, total)
+
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "config": {
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "elapsed": round(elapsed, 3),
+            "mongo": args.mongo,
+            "mix": {name: weight for name, (weight, *_rest) in parse_mix(args.mix).items()},
+        },
+        "total": total,
+        "routes": routes,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline and compare(routes, args.baseline, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark: per-request CPU of the response_model path versus serving
+pre-encoded snapshot bytes for the portfolio list and detail routes.
+
+Usage: python benchmarks/snapshot_benchmark.py [--copies N] [--iterations N]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+
+from fastapi import Response
+from fastapi.routing import serialize_response
+from json_encoding import FastJSONResponse
+from models import Project, Experience, TechnicalExpertise
+from http_cache import CachedPayload
+from routes.portfolio import router
+from seed_database import PROJECTS_DATA, EXPERIENCE_DATA, TECHNICAL_EXPERTISE_DATA
+
+
+def response_field(path):
+    for route in router.routes:
+        if route.path == f"{router.prefix}{path}":
+            return route.response_field
+    raise KeyError(path)
+
+
+def replicate(records, copies):
+    docs = []
+    for i in range(copies):
+        for record in records:
+            doc = dict(record)
+            doc["id"] = f"{record['id']}-{i}"
+            docs.append(doc)
+    return docs
+
+
+async def model_path(field, data):
+    """What FastAPI does per request when the handler returns models"""
+    content = await serialize_response(field=field, response_content=data)
+    return FastJSONResponse(content).body
+
+
+async def snapshot_path(payload):
+    """What the snapshot mode does per request: wrap the cached bytes"""
+    return Response(content=payload.body, media_type="application/json").body
+
+
+async def measure(fn, iterations):
+    start = time.process_time()
+    for _ in range(iterations):
+        await fn()
+    return (time.process_time() - start) / iterations * 1e6
+
+
+async def main(copies, iterations):
+    cases = [
+        ("/projects", Project, replicate(PROJECTS_DATA, copies), True),
+        ("/projects/{project_id}", Project, PROJECTS_DATA[:1], False),
+        ("/experience", Experience, replicate(EXPERIENCE_DATA, copies), True),
+        ("/expertise", TechnicalExpertise, replicate(TECHNICAL_EXPERTISE_DATA, copies), True),
+    ]
+
+    print(f"{'route':<26}{'docs':>6}{'models us':>12}{'snapshot us':>13}{'saved us':>11}{'speedup':>9}")
+    for path, model, docs, is_list in cases:
+        field = response_field(path)
+        data = [model(**doc) for doc in docs] if is_list else model(**docs[0])
+        payload = CachedPayload(data)
+
+        assert await model_path(field, data) == await snapshot_path(payload)
+
+        models_us = await measure(lambda: model_path(field, data), iterations)
+        snapshot_us = await measure(lambda: snapshot_path(payload), iterations)
+        print(
+            f"{path:<26}{len(docs):>6}{models_us:>12.1f}{snapshot_us:>13.1f}"
+            f"{models_us - snapshot_us:>11.1f}{models_us / snapshot_us:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=1, help="replicate the seed data N times")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.copies, args.iterations))
@@ -0,0 +1,108 @@
+"""
+Benchmark: cost of turning 1k stored documents into response models with
+per-document validation (Model(**doc), the previous list read path), one
+TypeAdapter batch validation (models.from_documents, the current one) and
+unvalidated model_construct, which pydantic v2 runs in Python and which is
+therefore no faster than validating in pydantic-core.
+
+Usage: python benchmarks/validation_benchmark.py [--documents N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+from models import (
+    ContactMessage,
+    ContactMessageResponse,
+    Experience,
+    Project,
+    TechnicalExpertise,
+)
+from seed_database import PROJECTS_DATA, EXPERIENCE_DATA, TECHNICAL_EXPERTISE_DATA
+
+
+def stored_documents(model, templates, count):
+    """Documents shaped like Motor returns them: validated on write, plus _id"""
+    created = datetime(2024, 1, 1)
+    docs = []
+    for i in range(count):
+        template = templates[i % len(templates)]
+        doc = model(**{**template, "id": f"{template.get('id', 'doc')}-{i}"}).model_dump()
+        if "created_at" in doc:
+            doc["created_at"] = created + timedelta(minutes=i)
+        doc["_id"] = ObjectId()
+        docs.append(doc)
+    return docs
+
+
+def contact_documents(count):
+    started = datetime(2024, 1, 1)
+    return [
+        {**ContactMessage(
+            name=f"Sender {i}",
+            email=f"sender{i}@example.com",
+            subject="Project inquiry",
+            message="Interested in a Dialogflow CX engagement",
+            timestamp=started + timedelta(seconds=i),
+        ).model_dump(), "_id": ObjectId()}
+        for i in range(count)
+    ]
+
+
+def best_of(fn, repeat):
+    """Best wall time in milliseconds over a few repeats"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main(count, repeat):
+    cases = [
+        ("projects", Project, stored_documents(Project, PROJECTS_DATA, count)),
+        ("experience", Experience, stored_documents(Experience, EXPERIENCE_DATA, count)),
+        ("expertise", TechnicalExpertise, stored_documents(TechnicalExpertise, TECHNICAL_EXPERTISE_DATA, count)),
+        ("contact messages", ContactMessageResponse, contact_documents(count)),
+    ]
+    per = 1000 / count
+
+    print(f"ms per 1k documents ({count} documents, best of {repeat})")
+    print(f"{'model':<20}{'per-doc':>10}{'batch':>10}{'construct':>10}{'batch gain':>11}")
+    for label, model, docs in cases:
+        adapter = TypeAdapter(List[model])
+        validated = [model(**doc) for doc in docs]
+        # All three paths must produce the same response data
+        assert adapter.validate_python(docs) == validated
+        assert [model.model_construct(**doc).model_dump() for doc in docs] == [
+            item.model_dump() for item in validated
+        ]
+
+        per_doc_ms = best_of(lambda: [model(**doc) for doc in docs], repeat) * per
+        batch_ms = best_of(lambda: adapter.validate_python(docs), repeat) * per
+        construct_ms = best_of(lambda: [model.model_construct(**doc) for doc in docs], repeat) * per
+        print(
+            f"{label:<20}{per_doc_ms:>10.3f}{batch_ms:>10.3f}{construct_ms:>10.3f}"
+            f"{per_doc_ms / batch_ms:>10.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.documents, args.repeat)
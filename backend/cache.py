@@ -0,0 +1,176 @@
+from collections import OrderedDict
+from metrics import registry
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Portfolio data only changes when the seeder runs, so reads are served from
+# an in-process cache and only fall through to MongoDB on a miss or expiry.
+CACHE_TTL_SECONDS = float(os.environ.get('PORTFOLIO_CACHE_TTL', '300'))
+CACHE_MAX_ENTRIES = int(os.environ.get('PORTFOLIO_CACHE_MAX_ENTRIES', '256'))
+# The seeder runs in its own process, so each worker polls for its data
+# version at most this often and drops its cache when the version moves
+CACHE_CHECK_SECONDS = float(os.environ.get('PORTFOLIO_CACHE_CHECK_SECONDS', '5'))
+
+
+def cache_key(route, **params):
+    """Build a stable cache key from a route name and its query params"""
+    parts = [route]
+    for name in sorted(params):
+        value = params[name]
+        if value is not None:
+            parts.append(f"{name}={value}")
+    return "|".join(parts)
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry if full"""
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_or_load(self, key, loader):
+        """Return the cached value for key, calling the async loader on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = await loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, route=None):
+        """Drop every entry, or only those cached for the given route"""
+        with self._lock:
+            if route is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+
+            stale = [
+                key for key in self._entries
+                if key == route or key.startswith(f"{route}|")
+            ]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+portfolio_cache = TTLCache()
+
+
+# Routes whose cached payloads embed other routes' data
+COMPOSITE_ROUTES = ("bundle",)
+
+
+def invalidate_portfolio_cache(route=None):
+    """Invalidation hook for anything that rewrites portfolio collections"""
+    removed = portfolio_cache.invalidate(route)
+    if route is not None and route not in COMPOSITE_ROUTES:
+        for composite in COMPOSITE_ROUTES:
+            removed += portfolio_cache.invalidate(composite)
+    return removed
+
+
+# Marks a watcher that has not read the version yet; None is a real version
+# (no stats document stored), so it can't double as "never checked"
+_UNSET = object()
+
+
+class DataVersionWatcher:
+    """Invalidates the portfolio cache when another process stores new data"""
+
+    def __init__(self, check_interval=CACHE_CHECK_SECONDS):
+        self.check_interval = check_interval
+        self._version = _UNSET
+        self._checked_at = float("-inf")
+
+    async def check(self, load_version):
+        """Compare the stored version with the last one seen, at most once per interval
+
+        Returns True when the version changed and the cache was dropped.
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return False
+        # Set before awaiting so concurrent requests don't issue the same read
+        self._checked_at = now
+        try:
+            version = await load_version()
+        except Exception as e:
+            logger.error(f"Error checking portfolio data version: {e}")
+            return False
+
+        changed = self._version is not _UNSET and version != self._version
+        self._version = version
+        if changed:
+            removed = invalidate_portfolio_cache()
+            logger.info(f"Portfolio data changed, dropped {removed} cached responses")
+        return changed
+
+
+portfolio_version = DataVersionWatcher()
+
+
+def _cache_metrics():
+    stats = portfolio_cache.stats()
+    return [
+        ("portfolio_cache_hits_total", "counter", "Portfolio cache hits", [({}, stats["hits"])]),
+        ("portfolio_cache_misses_total", "counter", "Portfolio cache misses", [({}, stats["misses"])]),
+        ("portfolio_cache_evictions_total", "counter", "Portfolio cache LRU evictions", [({}, stats["evictions"])]),
+        ("portfolio_cache_entries", "gauge", "Portfolio cache entries held", [({}, stats["entries"])]),
+    ]
+
+
+registry.add_collector(_cache_metrics)
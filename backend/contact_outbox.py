@@ -0,0 +1,323 @@
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+from database import contact_messages, contact_outbox as outbox_collection
+from metrics import registry
+from notifications import configured_notifiers
+import asyncio
+import logging
+import os
+import random
+
+logger = logging.getLogger(__name__)
+
+# Post-processing for stored contact messages (notifications and the like),
+# persisted in contact_outbox so every handler runs at least once
+OUTBOX_WORKERS = int(os.environ.get('CONTACT_OUTBOX_WORKERS', '4'))
+OUTBOX_QUEUE_SIZE = int(os.environ.get('CONTACT_OUTBOX_QUEUE_SIZE', '1000'))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('CONTACT_OUTBOX_MAX_ATTEMPTS', '8'))
+OUTBOX_RETRY_BASE = float(os.environ.get('CONTACT_OUTBOX_RETRY_BASE_SECONDS', '2'))
+OUTBOX_RETRY_MAX = float(os.environ.get('CONTACT_OUTBOX_RETRY_MAX_SECONDS', '600'))
+# Scan for new messages, due retries and entries left over from a restart
+OUTBOX_POLL_INTERVAL = float(os.environ.get('CONTACT_OUTBOX_POLL_SECONDS', '5'))
+# A claimed entry whose worker died becomes due again after the lease
+OUTBOX_LEASE_SECONDS = float(os.environ.get('CONTACT_OUTBOX_LEASE_SECONDS', '60'))
+
+MESSAGE_FIELDS = ("id", "name", "email", "subject", "message", "timestamp", "status")
+
+outbox_deliveries = registry.counter(
+    "contact_outbox_deliveries_total",
+    "Contact outbox handler attempts by handler and outcome",
+    ("handler", "outcome"),
+)
+
+
+def _message_payload(document):
+    message = {field: document.get(field) for field in MESSAGE_FIELDS}
+    if isinstance(message["timestamp"], datetime):
+        message["timestamp"] = message["timestamp"].isoformat()
+    return message
+
+
+class ContactOutbox:
+    """Worker pool delivering outbox entries with retries and exponential backoff
+
+    Contact messages are stored with the names of the handlers still to run in
+    pending_handlers. A scan, woken by wake() after each insert and otherwise
+    run periodically, turns those into one entry per handler and offers them
+    to a bounded in-process queue. Workers claim entries with a lease, so
+    several processes can share the collection; entries that don't fit in the
+    queue, retries and anything left over from a restart are picked up by the
+    same scan.
+    """
+
+    def __init__(
+        self,
+        collection,
+        messages,
+        handlers,
+        workers=OUTBOX_WORKERS,
+        max_queue=OUTBOX_QUEUE_SIZE,
+        max_attempts=OUTBOX_MAX_ATTEMPTS,
+        retry_base=OUTBOX_RETRY_BASE,
+        retry_max=OUTBOX_RETRY_MAX,
+        poll_interval=OUTBOX_POLL_INTERVAL,
+        lease=OUTBOX_LEASE_SECONDS
+    ):
+        self.collection = collection
+        self.messages = messages
+        self.handlers = handlers
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self._queue = None
+        self._queued = set()
+        self._tasks = []
+        self._poller = None
+        self._stopping = None
+        self._wakeup = None
+        self._retry_timers = {}
+
+    @property
+    def enabled(self):
+        return bool(self.handlers)
+
+    @property
+    def handler_names(self):
+        """Handlers a new contact message is stored as pending for"""
+        return list(self.handlers)
+
+    @property
+    def running(self):
+        return self._poller is not None and not self._poller.done()
+
+    async def start(self):
+        """Start the workers and the due-entry scan on the running event loop"""
+        if self.running or not self.enabled:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._queued = set()
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._poller = asyncio.create_task(self._poll())
+        logger.info(
+            f"Contact outbox started: handlers={list(self.handlers)}, workers={self.workers}"
+        )
+
+    def wake(self):
+        """Run the scan now instead of at the next interval, e.g. after an insert"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _create_entries(self, document):
+        """Persist one outbox entry per pending handler, then clear the message's list"""
+        now = datetime.utcnow()
+        message = _message_payload(document)
+        entries = [
+            {
+                # One entry per message and handler, so a retried enqueue is a no-op
+                "_id": f"{message['id']}:{name}",
+                "message_id": message["id"],
+                "handler": name,
+                "message": message,
+                "status": "pending",
+                "attempts": 0,
+                "next_attempt_at": now,
+                "locked_until": None,
+                "last_error": None,
+                "created_at": now,
+            }
+            for name in document["pending_handlers"]
+        ]
+        try:
+            await self.collection.insert_many(entries, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+        # Only after the entries exist; a crash in between repeats the
+        # inserts above, which the per-handler _id turns into no-ops
+        await self.messages.update_one(
+            {"id": message["id"]}, {"$unset": {"pending_handlers": ""}}
+        )
+        for entry in entries:
+            self._offer(entry["_id"])
+        return [entry["_id"] for entry in entries]
+
+    async def drain(self, timeout=10):
+        """Stop scanning, give queued entries a chance to finish, then stop the workers
+
+        Entries still pending afterwards stay in the collection for the next start.
+        """
+        if not self.running:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await self._poller
+        for timer in self._retry_timers.values():
+            timer.cancel()
+        self._retry_timers.clear()
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Contact outbox drain timed out with {self._queue.qsize()} entries queued")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._poller = None
+        logger.info("Contact outbox drained")
+
+    def _offer(self, entry_id):
+        """Queue an entry id without blocking; a full queue leaves it to the scan"""
+        if self._stopping is None or self._stopping.is_set() or entry_id in self._queued:
+            return
+        try:
+            self._queue.put_nowait(entry_id)
+        except asyncio.QueueFull:
+            return
+        self._queued.add(entry_id)
+
+    async def _poll(self):
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                await self._create_pending()
+                await self._enqueue_due()
+            except Exception as e:
+                logger.error(f"Error scanning contact outbox: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _create_pending(self):
+        """Create entries for stored messages that still list pending handlers"""
+        cursor = self.messages.find(
+            {"pending_handlers": {"$exists": True}},
+            {field: 1 for field in MESSAGE_FIELDS + ("pending_handlers",)}
+        ).limit(self.workers * 100)
+        async for document in cursor:
+            await self._create_entries(document)
+
+    async def _enqueue_due(self):
+        free = self.max_queue - self._queue.qsize() if self.max_queue > 0 else self.workers * 100
+        if free <= 0:
+            return
+        now = datetime.utcnow()
+        cursor = self.collection.find(
+            {
+                "status": "pending",
+                "next_attempt_at": {"$lte": now},
+                "$or": [{"locked_until": None}, {"locked_until": {"$lte": now}}],
+            },
+            {"_id": 1}
+        ).sort("next_attempt_at", 1).limit(free)
+        async for entry in cursor:
+            self._offer(entry["_id"])
+
+    async def _work(self):
+        while True:
+            entry_id = await self._queue.get()
+            self._queued.discard(entry_id)
+            try:
+                await self._process(entry_id)
+            except Exception as e:
+                logger.error(f"Error processing contact outbox entry {entry_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, entry_id):
+        now = datetime.utcnow()
+        # Claim the entry so no other worker or process runs it concurrently
+        entry = await self.collection.find_one_and_update(
+            {
+                "_id": entry_id,
+                "status": "pending",
+                "next_attempt_at": {"$lte": now},
+                "$or": [{"locked_until": None}, {"locked_until": {"$lte": now}}],
+            },
+            {
+                "$set": {"locked_until": now + timedelta(seconds=self.lease)},
+                "$inc": {"attempts": 1},
+            },
+            return_document=ReturnDocument.AFTER
+        )
+        if entry is None:
+            return
+
+        handler = self.handlers.get(entry["handler"])
+        if handler is None:
+            await self._finish(entry, "failed", "No handler configured")
+            return
+
+        try:
+            await asyncio.wait_for(handler.deliver(entry["message"]), self.lease)
+        except Exception as e:
+            await self._retry_or_fail(entry, e)
+            return
+
+        await self._finish(entry, "delivered")
+        outbox_deliveries.inc(handler=entry["handler"], outcome="delivered")
+        logger.info(f"Contact outbox {entry['handler']} delivered for message {entry['message_id']}")
+
+    async def _finish(self, entry, status, error=None):
+        fields = {"status": status, "locked_until": None, "last_error": error}
+        if status == "delivered":
+            fields["delivered_at"] = datetime.utcnow()
+        await self.collection.update_one({"_id": entry["_id"]}, {"$set": fields})
+
+    async def _retry_or_fail(self, entry, error):
+        error = f"{type(error).__name__}: {error}"
+        if entry["attempts"] >= self.max_attempts:
+            await self._finish(entry, "failed", error)
+            outbox_deliveries.inc(handler=entry["handler"], outcome="failed")
+            logger.error(
+                f"Contact outbox {entry['handler']} gave up on message {entry['message_id']} "
+                f"after {entry['attempts']} attempts: {error}"
+            )
+            return
+
+        # Exponential backoff with jitter so failing handlers aren't hammered in lockstep
+        delay = min(self.retry_max, self.retry_base * 2 ** (entry["attempts"] - 1))
+        delay *= random.uniform(0.5, 1.0)
+        await self.collection.update_one(
+            {"_id": entry["_id"]},
+            {"$set": {
+                "locked_until": None,
+                "last_error": error,
+                "next_attempt_at": datetime.utcnow() + timedelta(seconds=delay),
+            }}
+        )
+        outbox_deliveries.inc(handler=entry["handler"], outcome="retried")
+        logger.warning(
+            f"Contact outbox {entry['handler']} failed for message {entry['message_id']} "
+            f"(attempt {entry['attempts']}), retrying in {delay:.1f}s: {error}"
+        )
+
+        # Requeue in-process when due; the scan is the backstop
+        self._retry_timers[entry["_id"]] = asyncio.get_running_loop().call_later(
+            delay, self._retry_due, entry["_id"]
+        )
+
+    def _retry_due(self, entry_id):
+        self._retry_timers.pop(entry_id, None)
+        self._offer(entry_id)
+
+
+contact_outbox = ContactOutbox(outbox_collection, contact_messages, configured_notifiers())
+
+
+def _outbox_metrics():
+    queued = contact_outbox._queue.qsize() if contact_outbox._queue is not None else 0
+    return [
+        ("contact_outbox_queue_depth", "gauge", "Contact outbox entries waiting for a worker",
+         [({}, queued)]),
+    ]
+
+
+registry.add_collector(_outbox_metrics)
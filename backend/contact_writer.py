@@ -0,0 +1,201 @@
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from database import contact_messages
+from metrics import registry
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Write-behind batching for contact form submissions (disabled by default)
+BATCHING_ENABLED = os.environ.get('CONTACT_WRITE_BATCHING', 'false').lower() == 'true'
+BATCH_SIZE = int(os.environ.get('CONTACT_BATCH_SIZE', '100'))
+BATCH_INTERVAL = float(os.environ.get('CONTACT_BATCH_INTERVAL_MS', '50')) / 1000
+BATCH_QUEUE_SIZE = int(os.environ.get('CONTACT_BATCH_QUEUE_SIZE', '10000'))
+# "flush": the request waits until its batch is written (durable)
+# "enqueue": the request returns as soon as the document is buffered
+BATCH_ACK_MODE = os.environ.get('CONTACT_BATCH_ACK', 'flush').lower()
+
+
+def _dedup_keys(document):
+    return [
+        (field, document[field])
+        for field in ("idempotency_key", "content_hash")
+        if document.get(field)
+    ]
+
+
+class BatchingWriter:
+    """Buffers documents in an asyncio queue and writes them with insert_many"""
+
+    def __init__(
+        self,
+        collection,
+        batch_size=BATCH_SIZE,
+        interval=BATCH_INTERVAL,
+        ack_mode=BATCH_ACK_MODE,
+        max_queue=BATCH_QUEUE_SIZE
+    ):
+        if ack_mode not in ("flush", "enqueue"):
+            raise ValueError(f"Invalid ack mode: {ack_mode}. Must be 'flush' or 'enqueue'")
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.ack_mode = ack_mode
+        self.max_queue = max_queue
+        self._queue = None
+        self._task = None
+        self._closing = False
+        # Dedup keys of documents acknowledged in enqueue mode but not yet written
+        self._buffered = {}
+        self.batches_written = 0
+        self.documents_written = 0
+        self.documents_failed = 0
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done() and not self._closing
+
+    async def start(self):
+        """Start the background flush loop on the running event loop"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._closing = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Contact batching writer started: batch_size={self.batch_size}, "
+            f"interval={self.interval}s, ack={self.ack_mode}"
+        )
+
+    async def submit(self, document):
+        """Queue a document; in flush mode wait until its batch is stored"""
+        if not self.running:
+            raise RuntimeError("Batching writer is not running")
+
+        if self.ack_mode == "enqueue":
+            # The caller answers before the insert runs, so a duplicate of a
+            # buffered message is rejected here instead of dropped at flush time
+            if self.find_buffered(document.get("idempotency_key"), document.get("content_hash")):
+                raise DuplicateKeyError("Duplicate of a buffered contact message", 11000)
+            for key in _dedup_keys(document):
+                self._buffered[key] = document
+            await self._queue.put((document, None))
+            return document["id"]
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((document, future))
+        return await future
+
+    def find_buffered(self, idempotency_key, content_hash):
+        """Return a buffered document with the same idempotency key or content hash"""
+        for key in _dedup_keys({"idempotency_key": idempotency_key, "content_hash": content_hash}):
+            if key in self._buffered:
+                return self._buffered[key]
+        return None
+
+    async def drain(self):
+        """Flush everything still buffered and stop the flush loop"""
+        if not self.running:
+            return
+        # New submissions fall back to direct inserts from here on
+        self._closing = True
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        logger.info(
+            f"Contact batching writer drained: {self.documents_written} written, "
+            f"{self.documents_failed} failed in {self.batches_written} batches"
+        )
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush(batch)
+
+        # Anything queued after the stop marker still gets written
+        leftovers = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                leftovers.append(item)
+        for start in range(0, len(leftovers), self.batch_size):
+            await self._flush(leftovers[start:start + self.batch_size])
+
+    async def _flush(self, batch):
+        documents = [document for document, _ in batch]
+        errors = {}
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                errors[error["index"]] = error
+        except Exception as e:
+            errors = {index: e for index in range(len(batch))}
+
+        for document in documents:
+            for key in _dedup_keys(document):
+                if self._buffered.get(key) is document:
+                    del self._buffered[key]
+
+        self.batches_written += 1
+        self.documents_written += len(batch) - len(errors)
+        self.documents_failed += len(errors)
+
+        for index, (document, future) in enumerate(batch):
+            error = errors.get(index)
+            duplicate = isinstance(error, dict) and error.get("code") == 11000
+            if duplicate:
+                logger.info(f"Suppressed duplicate contact message {document['id']}")
+            elif error is not None:
+                logger.error(f"Error writing batched contact message {document['id']}: {error}")
+            if future is None or future.done():
+                continue
+            if error is None:
+                future.set_result(document["id"])
+            elif isinstance(error, Exception):
+                future.set_exception(error)
+            elif duplicate:
+                # Surface duplicates like insert_one does so callers can replay
+                future.set_exception(DuplicateKeyError(error.get("errmsg", ""), 11000, error))
+            else:
+                future.set_exception(RuntimeError(error.get("errmsg", "Write failed")))
+
+
+contact_writer = BatchingWriter(contact_messages)
+
+
+def _writer_metrics():
+    queued = contact_writer._queue.qsize() if contact_writer._queue is not None else 0
+    return [
+        ("contact_batch_writes_total", "counter", "insert_many batches issued by the contact writer",
+         [({}, contact_writer.batches_written)]),
+        ("contact_batch_documents_total", "counter", "Contact messages written by the batching writer",
+         [({"outcome": "written"}, contact_writer.documents_written),
+          ({"outcome": "failed"}, contact_writer.documents_failed)]),
+        ("contact_batch_queue_depth", "gauge", "Contact messages waiting to be flushed",
+         [({}, queued)]),
+    ]
+
+
+registry.add_collector(_writer_metrics)
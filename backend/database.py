@@ -1,9 +1,46 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from datetime import datetime
+from metrics import mongo_command_metrics, mongo_pool_stats
+from indexes import AUTO_CREATE_INDEXES, ensure_indexes
+import asyncio
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
+# Connection pool settings, tunable per worker from the environment
+POOL_OPTIONS = {
+    "maxPoolSize": ("MONGO_MAX_POOL_SIZE", int),
+    "minPoolSize": ("MONGO_MIN_POOL_SIZE", int),
+    "maxIdleTimeMS": ("MONGO_MAX_IDLE_TIME_MS", int),
+    "maxConnecting": ("MONGO_MAX_CONNECTING", int),
+    "waitQueueTimeoutMS": ("MONGO_WAIT_QUEUE_TIMEOUT_MS", int),
+    "connectTimeoutMS": ("MONGO_CONNECT_TIMEOUT_MS", int),
+    "socketTimeoutMS": ("MONGO_SOCKET_TIMEOUT_MS", int),
+    "serverSelectionTimeoutMS": ("MONGO_SERVER_SELECTION_TIMEOUT_MS", int),
+    "compressors": ("MONGO_COMPRESSORS", str),  # e.g. "zstd,snappy,zlib"
+}
+# Connections opened during startup so the first requests don't pay for them
+WARMUP_CONNECTIONS = int(
+    os.environ.get('MONGO_WARMUP_CONNECTIONS', os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+)
+
+def pool_options():
+    """Collect the pool settings present in the environment"""
+    options = {}
+    for option, (env_name, cast) in POOL_OPTIONS.items():
+        value = os.environ.get(env_name)
+        if value:
+            options[option] = cast(value)
+    return options
+
 # MongoDB connection
 mongo_url = os.environ.get('MONGO_URL')
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    event_listeners=[mongo_command_metrics, mongo_pool_stats],
+    **pool_options()
+)
 db = client[os.environ.get('DB_NAME', 'portfolio_db')]
 
 # Collections
@@ -11,21 +48,78 @@ contact_messages = db.contact_messages
 projects = db.projects
 experiences = db.experiences
 technical_expertise = db.technical_expertise
+portfolio_meta = db.portfolio_meta
+contact_outbox = db.contact_outbox
+
+# Materialized stats document maintained by the seeder
+STATS_DOCUMENT_ID = "stats"
 
 async def init_database():
-    """Initialize database with indexes"""
+    """Initialize database indexes from the declarative spec in indexes.py"""
+    if not AUTO_CREATE_INDEXES:
+        logger.info("Skipping index creation, MONGO_AUTO_CREATE_INDEXES is false")
+        return None
     try:
-        # Create indexes for better performance
-        await contact_messages.create_index("timestamp")
-        await contact_messages.create_index("status")
-        await projects.create_index("category")
-        await projects.create_index("created_at")
-        await experiences.create_index("company")
-        await technical_expertise.create_index("category")
-        
-        print("Database initialized successfully")
+        report = await ensure_indexes(db)
+        logger.info("Database initialized successfully")
+        return report
     except Exception as e:
-        print(f"Error initializing database: {e}")
+        logger.error(f"Error initializing database indexes: {e}")
+        return None
+
+async def warm_up_pool(connections=WARMUP_CONNECTIONS):
+    """Open pooled connections up front by issuing concurrent pings"""
+    if connections <= 0:
+        return 0
+    results = await asyncio.gather(
+        *(client.admin.command("ping") for _ in range(connections)),
+        return_exceptions=True
+    )
+    failures = [result for result in results if isinstance(result, Exception)]
+    if failures:
+        logger.error(f"Connection pool warm-up failed for {len(failures)} connections: {failures[0]}")
+    else:
+        logger.info(f"Connection pool warmed: {mongo_pool_stats.snapshot()}")
+    return connections - len(failures)
+
+async def compute_portfolio_stats():
+    """Count portfolio documents, running all queries concurrently"""
+    project_count, experience_count, expertise_count, project_categories = await asyncio.gather(
+        projects.count_documents({}),
+        experiences.count_documents({}),
+        technical_expertise.count_documents({}),
+        projects.distinct("category"),
+    )
+    return {
+        "total_projects": project_count,
+        "total_experience_entries": experience_count,
+        "total_expertise_areas": expertise_count,
+        "project_categories": sorted(project_categories),
+    }
+
+async def refresh_portfolio_stats():
+    """Recompute and store the materialized stats document"""
+    stats = await compute_portfolio_stats()
+    await portfolio_meta.replace_one(
+        {"_id": STATS_DOCUMENT_ID},
+        {**stats, "updated_at": datetime.utcnow()},
+        upsert=True
+    )
+    return stats
+
+async def load_portfolio_stats():
+    """Read the materialized stats, computing them live if the seeder never wrote them"""
+    stats = await portfolio_meta.find_one(
+        {"_id": STATS_DOCUMENT_ID}, {"_id": 0, "updated_at": 0}
+    )
+    if stats is None:
+        stats = await compute_portfolio_stats()
+    return stats
+
+async def load_portfolio_version():
+    """When the seeder last stored new portfolio data, or None if it never ran"""
+    stats = await portfolio_meta.find_one({"_id": STATS_DOCUMENT_ID}, {"_id": 0, "updated_at": 1})
+    return stats.get("updated_at") if stats else None
 
 async def close_database():
     """Close database connection"""
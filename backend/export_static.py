@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import re
+import shutil
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent
+sys.path.append(str(backend_path))
+
+from compression import COMPRESSION_MIN_SIZE, supported_encodings
+from database import close_database
+from routes.portfolio import render_static_responses
+
+# Same prefix server.py mounts the API router under
+API_PREFIX = "/api"
+FILE_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+def slugify(value):
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or "-"
+
+def file_for(url):
+    """Map a URL to a relative file path, moving query params into the path
+
+    /api/portfolio/projects?category=Healthcare AI becomes
+    api/portfolio/projects/category/healthcare-ai.json. Path segments are
+    slugified like query values, so ids containing "/" or ".." stay inside
+    the export directory.
+    """
+    parts = urlsplit(url)
+    path = "/".join(slugify(unquote(segment)) for segment in parts.path.split("/") if segment)
+    for name, value in parse_qsl(parts.query):
+        path = f"{path}/{slugify(name)}/{slugify(value)}"
+    return f"{path}.json"
+
+def write_file(root, relative, body):
+    target = root / relative
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(body)
+
+async def export_static(output):
+    """Render every portfolio GET into output with precompressed copies and a manifest"""
+    output = Path(output)
+    # Build beside the target and swap directories at the end, so a server
+    # pointed at output never sees a half-written export
+    staging = output.with_name(f"{output.name}.tmp")
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+
+    manifest = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "routes": {},
+    }
+    files = set()
+    for url, _, payload in await render_static_responses():
+        url = f"{API_PREFIX}{url}"
+        relative = file_for(url)
+        if relative in files:
+            raise ValueError(f"Two routes map to {relative}, last one was {url}")
+        files.add(relative)
+
+        write_file(staging, relative, payload.body)
+        headers = payload.headers()
+        entry = {
+            "file": relative,
+            "content_type": "application/json",
+            "bytes": len(payload.body),
+            "etag": payload.etag,
+            "last_modified": headers.get("Last-Modified"),
+            "cache_control": headers["Cache-Control"],
+            "encodings": {},
+        }
+        if len(payload.body) >= COMPRESSION_MIN_SIZE:
+            for encoding in supported_encodings():
+                body = payload.body_for(encoding, precompress=True)
+                encoded_file = relative + FILE_SUFFIXES[encoding]
+                write_file(staging, encoded_file, body)
+                entry["encodings"][encoding] = {"file": encoded_file, "bytes": len(body)}
+        manifest["routes"][url] = entry
+        print(f"Rendered {url} -> {relative}")
+
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    previous = output.with_name(f"{output.name}.old")
+    if previous.exists():
+        shutil.rmtree(previous)
+    if output.exists():
+        output.rename(previous)
+    staging.rename(output)
+    if previous.exists():
+        shutil.rmtree(previous)
+
+    print(f"Exported {len(manifest['routes'])} routes to {output}")
+    return manifest
+
+async def main(output):
+    try:
+        return await export_static(output)
+    except Exception as e:
+        print(f"Error exporting static snapshot: {e}")
+        raise
+    finally:
+        await close_database()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Render the read-only portfolio API into static JSON files for a file server or CDN"
+    )
+    parser.add_argument(
+        "--output",
+        default="static_export",
+        help="directory to write; it is replaced as a whole once the export completes"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.output))
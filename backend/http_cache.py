@@ -0,0 +1,145 @@
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from compression import (
+    COMPRESSION_MIN_SIZE,
+    compress,
+    decoded_etag,
+    encoded_etag,
+    negotiate,
+)
+from json_encoding import dumps
+from server_timing import phase
+import hashlib
+import os
+
+# How long browsers and the CDN may reuse a portfolio response before revalidating
+CACHE_MAX_AGE = int(os.environ.get('PORTFOLIO_CACHE_MAX_AGE', '60'))
+
+# Serve the pre-encoded JSON bytes directly instead of handing the models back
+# to FastAPI for a second validation and serialization pass on every request
+SNAPSHOTS_ENABLED = os.environ.get('PORTFOLIO_SNAPSHOTS', 'false').lower() == 'true'
+
+def version_time(version):
+    """Turn a stored data version (naive UTC datetime) into a Last-Modified value
+
+    HTTP dates only carry whole seconds. Returns None without a version, in
+    which case responses carry no Last-Modified and only ETags validate.
+    """
+    if version is None:
+        return None
+    return version.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def encode_json(data):
+    """Encode data exactly as the app's default response class would render it"""
+    return dumps(jsonable_encoder(data))
+
+
+class CachedPayload:
+    """Response data, its encoded body and its validators for conditional GETs"""
+
+    # Set for payloads that only carry encoded bytes and must be served raw
+    prebuilt = False
+
+    def __init__(self, data, last_modified=None):
+        self.data = data
+        with phase("encoding"):
+            self.body = encode_json(data)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        # When the data version was stored, shared by every worker
+        self.last_modified = last_modified
+        self._compressed = {}
+
+    def body_for(self, encoding, precompress=False):
+        """Return the body in the given coding, compressing once per payload
+
+        Pass precompress=True for bodies written out once and served many times
+        (snapshot files, static exports); cache fills on the request path use the
+        moderate per-request levels.
+        """
+        if encoding is None:
+            return self.body
+        compressed = self._compressed.get((encoding, precompress))
+        if compressed is None:
+            with phase("compression"):
+                compressed = self._compressed[(encoding, precompress)] = compress(
+                    self.body, encoding, precompress=precompress
+                )
+        return compressed
+
+    def headers(self, encoding=None):
+        headers = {
+            "ETag": encoded_etag(self.etag, encoding) if encoding else self.etag,
+            "Cache-Control": f"public, max-age={CACHE_MAX_AGE}",
+            "Vary": "Accept-Encoding",
+        }
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+
+def _etag_matches(header, etag):
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(decoded_etag(tag.removeprefix("W/")) == etag for tag in candidates)
+
+
+def is_not_modified(request: Request, payload: CachedPayload):
+    """Check the request's conditional headers against the payload validators"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-Modified-Since is ignored whenever If-None-Match is present
+        return _etag_matches(if_none_match, payload.etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and payload.last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return payload.last_modified <= since
+
+    return False
+
+
+def conditional_response(
+    request: Request,
+    response: Response,
+    payload: CachedPayload,
+    raw: bool = False
+):
+    """Return a bare 304 if the client copy is current, otherwise the payload
+
+    Pass raw=True for payloads whose shape the route's response_model cannot
+    describe, so the pre-encoded body is served regardless of snapshot mode.
+    Without snapshots only uncompressed responses go back through the model.
+    """
+    encoding = None
+    if len(payload.body) >= COMPRESSION_MIN_SIZE:
+        encoding = negotiate(request.headers.get("accept-encoding"))
+
+    if is_not_modified(request, payload):
+        # Same ETag as the 200 being revalidated, which was that of the negotiated coding
+        headers = payload.headers(encoding)
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=304, headers=headers)
+
+    # Compressed bodies always come from the payload, so compression is paid
+    # once per cache entry rather than by the middleware on every hit
+    if raw or SNAPSHOTS_ENABLED or payload.prebuilt or encoding:
+        return Response(
+            content=payload.body_for(encoding),
+            media_type="application/json",
+            headers=payload.headers(encoding),
+        )
+
+    response.headers.update(payload.headers())
+    return payload.data
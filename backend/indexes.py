@@ -0,0 +1,266 @@
+"""
+Declarative index specification for every collection.
+
+init_database applies it on startup unless MONGO_AUTO_CREATE_INDEXES=false, in
+which case run it once per deploy instead of once per worker:
+
+    python indexes.py            # create missing indexes, apply TTL changes, report drift
+    python indexes.py --check    # report only; exits 1 when anything differs
+"""
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+import argparse
+import asyncio
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+AUTO_CREATE_INDEXES = os.environ.get('MONGO_AUTO_CREATE_INDEXES', 'true').lower() == 'true'
+# Contact messages older than this many days expire through a TTL index; 0 keeps them forever
+CONTACT_RETENTION_DAYS = int(os.environ.get('CONTACT_RETENTION_DAYS', '0'))
+# Delivered contact outbox entries are kept this long for auditing
+OUTBOX_RETENTION_DAYS = int(os.environ.get('CONTACT_OUTBOX_RETENTION_DAYS', '7'))
+
+# Options that change index behaviour and therefore count as drift
+COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+# Searchable fields per collection with their ranking weight. The text indexes
+# and the in-memory search index both use these, so results don't change
+# when search switches engines
+SEARCH_FIELDS = {
+    "projects": {
+        "title": 3, "client": 2, "category": 2, "technologies": 2,
+        "description": 1, "detailed_description": 1, "challenges": 1, "solutions": 1,
+    },
+    "experiences": {
+        "role": 3, "company": 3, "technologies_used": 2,
+        "achievements": 1, "detailed_responsibilities": 1, "key_projects": 1,
+    },
+    "technical_expertise": {
+        "title": 3, "category": 2, "technologies": 2, "description": 1,
+    },
+}
+
+
+def _timestamp_index():
+    if CONTACT_RETENTION_DAYS > 0:
+        return IndexModel(
+            [("timestamp", ASCENDING)],
+            expireAfterSeconds=CONTACT_RETENTION_DAYS * 86400
+        )
+    return IndexModel([("timestamp", ASCENDING)])
+
+
+def _text_index(collection):
+    weights = SEARCH_FIELDS[collection]
+    return IndexModel(
+        [(field, TEXT) for field in weights],
+        weights=weights,
+        name=f"{collection}_text"
+    )
+
+
+def index_spec():
+    """Indexes each collection should have, keyed by collection name"""
+    return {
+        "contact_messages": [
+            _timestamp_index(),
+            # Keyset pagination for the inbox
+            IndexModel([("timestamp", DESCENDING), ("id", DESCENDING)]),
+            # Sparse: the fields are only stored when set, so messages without
+            # a key (or stored before deduplication) don't collide on null
+            IndexModel([("idempotency_key", ASCENDING)], unique=True, sparse=True),
+            IndexModel([("content_hash", ASCENDING)], unique=True, sparse=True),
+            IndexModel([("status", ASCENDING)]),
+            # Messages whose outbox entries haven't been created yet
+            IndexModel([("pending_handlers", ASCENDING)], sparse=True),
+        ],
+        "contact_outbox": [
+            # Due-entry scan of the outbox workers
+            IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+            # Only delivered entries have delivered_at, so pending and failed ones stay
+            IndexModel(
+                [("delivered_at", ASCENDING)],
+                expireAfterSeconds=OUTBOX_RETENTION_DAYS * 86400
+            ),
+        ],
+        "projects": [
+            IndexModel([("category", ASCENDING)]),
+            IndexModel([("created_at", ASCENDING)]),
+            # Multikey: one entry per technology in the array
+            IndexModel([("technologies", ASCENDING)]),
+            # Text indexes back portfolio search once the corpus outgrows memory
+            _text_index("projects"),
+        ],
+        "experiences": [
+            IndexModel([("company", ASCENDING)]),
+            IndexModel([("start_date", DESCENDING), ("is_current", DESCENDING), ("end_date", DESCENDING)]),
+            _text_index("experiences"),
+        ],
+        "technical_expertise": [
+            IndexModel([("category", ASCENDING)]),
+            _text_index("technical_expertise"),
+        ],
+    }
+
+
+def _normalize(document):
+    """Reduce an index document to (keys, compared options) for comparison"""
+    key = dict(document["key"])
+    if "_fts" in key:
+        # The server reports text indexes by their internal _fts/_ftsx keys
+        fields = [(field, "text") for field in sorted(document.get("weights", {}))]
+        key = dict(fields + [(f, d) for f, d in key.items() if f not in ("_fts", "_ftsx")])
+    elif any(direction == "text" for direction in key.values()):
+        key = dict(sorted((f, d) for f, d in key.items() if d == "text")) | {
+            f: d for f, d in key.items() if d != "text"
+        }
+
+    options = {}
+    for name in COMPARED_OPTIONS:
+        if document.get(name) not in (None, False):
+            options[name] = document[name]
+    return tuple((field, int(d) if isinstance(d, float) else d) for field, d in key.items()), options
+
+
+async def diff_collection(collection, models):
+    """Compare wanted IndexModels with list_indexes(), matched by index name"""
+    existing = {spec["name"]: spec async for spec in collection.list_indexes()}
+    existing.pop("_id_", None)
+
+    diff = {"missing": [], "ttl": [], "changed": [], "extra": []}
+    wanted_names = set()
+    for model in models:
+        document = model.document
+        name = document["name"]
+        wanted_names.add(name)
+        if name not in existing:
+            diff["missing"].append(model)
+            continue
+        current_key, current_options = _normalize(existing[name])
+        wanted_key, wanted_options = _normalize(document)
+        if (current_key, current_options) == (wanted_key, wanted_options):
+            continue
+        current_options.pop("expireAfterSeconds", None)
+        ttl = wanted_options.pop("expireAfterSeconds", None)
+        if ttl is not None and (current_key, current_options) == (wanted_key, wanted_options):
+            # Only the TTL differs, which collMod changes in place
+            diff["ttl"].append((name, ttl))
+        else:
+            diff["changed"].append(name)
+    diff["extra"] = sorted(name for name in existing if name not in wanted_names)
+    return diff
+
+
+async def _set_ttl(collection, name, seconds):
+    """Add or change expireAfterSeconds on an existing index without rebuilding it"""
+    try:
+        await collection.database.command(
+            "collMod", collection.name, index={"name": name, "expireAfterSeconds": seconds}
+        )
+    except OperationFailure as e:
+        logger.error(f"Error setting TTL on {collection.name}.{name}: {e}")
+        return False
+    return True
+
+
+async def _sync_collection(collection, models, create):
+    diff = await diff_collection(collection, models)
+    created = []
+    ttl_updated = []
+    changed = list(diff["changed"])
+    if create and diff["missing"]:
+        # One createIndexes command builds every missing index in a single pass
+        created = await collection.create_indexes(diff["missing"])
+    for name, seconds in diff["ttl"]:
+        if not create:
+            continue
+        if await _set_ttl(collection, name, seconds):
+            ttl_updated.append(name)
+        else:
+            changed.append(name)
+    return {
+        "missing": [model.document["name"] for model in diff["missing"]],
+        "created": created,
+        "ttl_changed": [name for name, _ in diff["ttl"]],
+        "ttl_updated": ttl_updated,
+        "changed": changed,
+        "extra": diff["extra"],
+    }
+
+
+async def ensure_indexes(db, create=True):
+    """Create missing indexes on all collections concurrently and report drift
+
+    A TTL that differs from the spec is changed in place with collMod. Indexes
+    whose keys or other options differ, and indexes the spec doesn't know
+    about, are reported but never dropped automatically.
+    """
+    spec = index_spec()
+    results = await asyncio.gather(*(
+        _sync_collection(db[name], models, create) for name, models in spec.items()
+    ))
+    report = dict(zip(spec, results))
+
+    for name, result in report.items():
+        if result["created"]:
+            logger.info(f"Created indexes on {name}: {result['created']}")
+        if result["ttl_updated"]:
+            logger.info(f"Updated TTL of indexes on {name}: {result['ttl_updated']}")
+        if result["changed"]:
+            logger.warning(f"Index drift on {name}, definition differs from spec: {result['changed']}")
+        if result["extra"]:
+            logger.warning(f"Index drift on {name}, not in spec: {result['extra']}")
+    return report
+
+
+def has_drift(report, create=True):
+    return any(
+        result["changed"] or result["extra"]
+        or ((result["missing"] or result["ttl_changed"]) and not create)
+        for result in report.values()
+    )
+
+
+def print_report(report):
+    for name, result in report.items():
+        created = set(result["created"])
+        print(f"{name}:")
+        for index in result["missing"]:
+            print(f"  {'created' if index in created else 'missing'}: {index}")
+        updated = set(result["ttl_updated"])
+        for index in result["ttl_changed"]:
+            if index in updated:
+                print(f"  ttl updated: {index}")
+            elif index not in result["changed"]:
+                print(f"  ttl differs: {index}")
+        for index in result["changed"]:
+            print(f"  changed: {index}")
+        for index in result["extra"]:
+            print(f"  extra: {index}")
+        if not (result["missing"] or result["ttl_changed"] or result["changed"] or result["extra"]):
+            print("  up to date")
+
+
+async def main(check=False):
+    from database import db, close_database
+
+    try:
+        report = await ensure_indexes(db, create=not check)
+        print_report(report)
+        return has_drift(report, create=not check)
+    finally:
+        await close_database()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create missing MongoDB indexes and report drift")
+    parser.add_argument("--check", action="store_true",
+                        help="only report differences, exit 1 if the indexes don't match the spec")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    drift = asyncio.run(main(check=args.check))
+    sys.exit(1 if drift and args.check else 0)
@@ -0,0 +1,52 @@
+from fastapi.responses import JSONResponse
+from server_timing import phase
+import json
+import os
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib encoder is the fallback
+    orjson = None
+
+# "auto" uses orjson when it is installed, "stdlib" forces the json module
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'auto').lower()
+USE_ORJSON = orjson is not None and JSON_ENCODER != 'stdlib'
+
+
+def _stdlib_dumps(content):
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _orjson_dumps(content):
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def dumps(content):
+    """Encode JSON-compatible content to compact UTF-8 bytes"""
+    if USE_ORJSON:
+        return _orjson_dumps(content)
+    return _stdlib_dumps(content)
+
+
+def encoder_name():
+    return "orjson" if USE_ORJSON else "stdlib"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available
+
+    For the strings, ints, bools and ordinary floats the API returns, the
+    output matches JSONResponse. orjson differs at the edges: it writes NaN
+    and infinity as null where JSONResponse raises, and it formats exponents
+    differently (1e16 rather than 1e+16).
+    """
+
+    def render(self, content):
+        with phase("encoding"):
+            return dumps(content)
@@ -0,0 +1,350 @@
+from pymongo import monitoring
+import threading
+import time
+
+# Latency buckets in seconds, shared by the HTTP and Mongo histograms
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        with self._lock:
+            items = sorted((key, ([*state[0]], state[1], state[2])) for key, state in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    """Holds metrics plus callbacks that report state owned by other modules"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """Register a callable returning (name, type, help, [(labels_dict, value)])"""
+        self._collectors.append(collector)
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, type_name, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {type_name}")
+                for labels, value in samples:
+                    lines.append(
+                        f"{name}{_format_labels(list(labels), list(labels.values()))} "
+                        f"{_format_value(value)}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+http_requests_in_progress = registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ("method",),
+)
+http_responses = registry.counter(
+    "http_responses_total",
+    "HTTP responses by route template and status code",
+    ("method", "route", "status"),
+)
+mongo_command_duration = registry.histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency by collection and command",
+    ("collection", "command", "outcome"),
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests and status codes"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_progress.inc(method=method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_progress.dec(method=method)
+            # Label by route template so path parameters don't explode cardinality
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            http_request_duration.observe(
+                elapsed, method=method, route=route_path, status=status_code
+            )
+            http_responses.inc(method=method, route=route_path, status=status_code)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding the per-collection latency histogram"""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name == "getMore":
+            # getMore's own value is the cursor id; the collection has its own field
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = "admin" if event.database_name == "admin" else "none"
+        with self._lock:
+            self._pending[(event.request_id, event.connection_id)] = collection
+
+    def _finish(self, event, outcome):
+        with self._lock:
+            collection = self._pending.pop((event.request_id, event.connection_id), "unknown")
+        mongo_command_duration.observe(
+            event.duration_micros / 1e6,
+            collection=collection,
+            command=event.command_name,
+            outcome=outcome,
+        )
+
+    def succeeded(self, event):
+        self._finish(event, "success")
+
+    def failed(self, event):
+        self._finish(event, "failure")
+
+
+mongo_command_metrics = MongoCommandMetrics()
+
+mongo_pool_checkout_wait = registry.histogram(
+    "mongo_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the pool",
+    ("address", "outcome"),
+)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Tracks open, checked-out and waiting connections per server address"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+        # Motor runs each pymongo call on an executor thread, so the checkout
+        # start time can be matched to its completion per thread
+        self._local = threading.local()
+
+    def _pool(self, address):
+        pool = self._pools.get(address)
+        if pool is None:
+            pool = self._pools[address] = {"open": 0, "checked_out": 0, "waiters": 0}
+        return pool
+
+    def _adjust(self, address, **deltas):
+        with self._lock:
+            pool = self._pool(address)
+            for name, delta in deltas.items():
+                pool[name] = max(0, pool[name] + delta)
+
+    def _observe_wait(self, event, outcome):
+        started = getattr(self._local, "checkout_started", None)
+        self._local.checkout_started = None
+        if started is not None:
+            mongo_pool_checkout_wait.observe(
+                time.perf_counter() - started,
+                address=_address_label(event.address),
+                outcome=outcome,
+            )
+
+    def pool_created(self, event):
+        self._adjust(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop(event.address, None)
+
+    def connection_created(self, event):
+        self._adjust(event.address, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._adjust(event.address, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+        self._adjust(event.address, waiters=1)
+
+    def connection_check_out_failed(self, event):
+        self._adjust(event.address, waiters=-1)
+        self._observe_wait(event, "failure")
+
+    def connection_checked_out(self, event):
+        self._adjust(event.address, waiters=-1, checked_out=1)
+        self._observe_wait(event, "success")
+
+    def connection_checked_in(self, event):
+        self._adjust(event.address, checked_out=-1)
+
+    def snapshot(self):
+        """Current pool utilization keyed by "host:port" """
+        with self._lock:
+            return {_address_label(address): dict(pool) for address, pool in self._pools.items()}
+
+    def collect(self):
+        pools = self.snapshot()
+        return [
+            ("mongo_pool_connections", "gauge", "Connections held by the pool by state",
+             [({"address": address, "state": state}, pool[state])
+              for address, pool in pools.items() for state in ("open", "checked_out")]),
+            ("mongo_pool_waiters", "gauge", "Operations waiting for a pooled connection",
+             [({"address": address}, pool["waiters"]) for address, pool in pools.items()]),
+        ]
+
+
+def _address_label(address):
+    host, port = address
+    return f"{host}:{port}"
+
+
+mongo_pool_stats = PoolStatsListener()
+registry.add_collector(mongo_pool_stats.collect)
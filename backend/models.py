@@ -1,8 +1,43 @@
-from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional
+from pydantic import BaseModel, Field, EmailStr, TypeAdapter, create_model, model_validator
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
+from functools import lru_cache
+import re
 import uuid
 
+_PERIOD_SEPARATOR = re.compile(r"\s*(?:-|–|—|\bto\b)\s*")
+_PERIOD_MONTH = re.compile(r"^([A-Za-z]{3})[A-Za-z]*\.?")
+_PERIOD_FORMATS = ("%b %Y", "%m/%Y", "%Y")
+_PERIOD_OPEN_ENDED = {"present", "current", "now"}
+
+def _parse_period_date(value):
+    # Accept full and abbreviated month names ("September", "Sept.", "Sep")
+    value = _PERIOD_MONTH.sub(r"\1", value.strip())
+    for fmt in _PERIOD_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+def parse_period(period):
+    """Split a period such as "Feb 2021 - Nov 2024" into (start_date, end_date)
+
+    end_date is None for open-ended periods ("Nov 2024 - Present") and either
+    side is None when it cannot be parsed.
+    """
+    parts = _PERIOD_SEPARATOR.split(period.strip(), maxsplit=1)
+    start_date = _parse_period_date(parts[0])
+    end_date = None
+    if len(parts) > 1 and not is_open_ended(period):
+        end_date = _parse_period_date(parts[1])
+    return start_date, end_date
+
+def is_open_ended(period):
+    """Whether a period runs to the present ("Nov 2024 - Present")"""
+    parts = _PERIOD_SEPARATOR.split(period.strip(), maxsplit=1)
+    return len(parts) > 1 and parts[1].strip().lower() in _PERIOD_OPEN_ENDED
+
 # Contact Form Models
 class ContactMessage(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -12,6 +47,9 @@ class ContactMessage(BaseModel):
     message: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
     status: str = Field(default="unread")  # unread, read, replied
+    idempotency_key: Optional[str] = None  # client-supplied Idempotency-Key header
+    content_hash: Optional[str] = None  # email+subject+message within the duplicate window
+    pending_handlers: Optional[List[str]] = None  # outbox handlers not yet turned into entries
 
 class ContactMessageCreate(BaseModel):
     name: str = Field(..., min_length=2, max_length=100)
@@ -28,6 +66,10 @@ class ContactMessageResponse(BaseModel):
     timestamp: datetime
     status: str
 
+class ContactMessagePage(BaseModel):
+    messages: List[ContactMessageResponse]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to fetch the next page
+
 # Portfolio Models
 class Project(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -46,6 +88,33 @@ class Project(BaseModel):
     solutions: Optional[List[str]] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class ProjectSummary(BaseModel):
+    id: str
+    title: str
+    description: str
+    category: str
+    technologies: List[str]
+
+# Named sparse fieldsets accepted by the project list ?fields= parameter
+PROJECT_FIELD_PRESETS = {
+    "summary": list(ProjectSummary.model_fields),
+    "full": list(Project.model_fields),
+}
+
+@lru_cache(maxsize=64)
+def project_model_for(fields):
+    """Return a response model exposing only the given tuple of Project fields"""
+    if set(fields) == set(PROJECT_FIELD_PRESETS["full"]):
+        return Project
+    if set(fields) == set(PROJECT_FIELD_PRESETS["summary"]):
+        return ProjectSummary
+    
+    definitions = {
+        name: (Optional[Project.model_fields[name].annotation], None)
+        for name in fields
+    }
+    return create_model(f"Project_{'_'.join(fields)}", **definitions)
+
 class Experience(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     company: str
@@ -57,6 +126,16 @@ class Experience(BaseModel):
     technologies_used: Optional[List[str]] = None
     team_leadership: Optional[bool] = False
     key_projects: Optional[List[str]] = None
+    start_date: Optional[datetime] = None  # derived from period
+    end_date: Optional[datetime] = None  # None while the role is current
+    is_current: bool = False  # sorts current roles ahead of ended ones with the same start
+
+    @model_validator(mode="after")
+    def derive_dates(self):
+        if self.start_date is None:
+            self.start_date, self.end_date = parse_period(self.period)
+            self.is_current = is_open_ended(self.period)
+        return self
 
 class TechnicalExpertise(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -65,4 +144,35 @@ class TechnicalExpertise(BaseModel):
     description: str
     technologies: List[str]
     experience_level: str  # Expert, Advanced, Intermediate
-    years_experience: Optional[int] = None
\ No newline at end of file
+    years_experience: Optional[int] = None
+
+# Portfolio page bundle: everything the frontend loads, in one response
+class PortfolioBundle(BaseModel):
+    projects: Union[List[Project], List[ProjectSummary]]
+    experience: List[Experience]
+    expertise: List[TechnicalExpertise]
+    stats: Dict[str, Any]
+
+# Search Models
+class SearchResult(BaseModel):
+    type: str  # project, experience, expertise
+    id: str
+    title: str
+    summary: str
+    score: float
+
+class SearchResponse(BaseModel):
+    query: str
+    engine: str  # memory, mongo
+    total: int
+    took_ms: float
+    results: List[SearchResult]
+
+# Building models from stored documents
+@lru_cache(maxsize=64)
+def _list_adapter(model):
+    return TypeAdapter(List[model])
+
+def from_documents(model, docs):
+    """Validate a list of stored documents into models in one pydantic-core call"""
+    return _list_adapter(model).validate_python(docs)
@@ -0,0 +1,112 @@
+from email.message import EmailMessage
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import smtplib
+import urllib.request
+
+# Notification email for new contact messages; disabled unless a host and recipient are set
+SMTP_HOST = os.environ.get('CONTACT_NOTIFY_SMTP_HOST', '')
+SMTP_PORT = int(os.environ.get('CONTACT_NOTIFY_SMTP_PORT', '25'))
+SMTP_USERNAME = os.environ.get('CONTACT_NOTIFY_SMTP_USERNAME', '')
+SMTP_PASSWORD = os.environ.get('CONTACT_NOTIFY_SMTP_PASSWORD', '')
+SMTP_STARTTLS = os.environ.get('CONTACT_NOTIFY_SMTP_STARTTLS', 'false').lower() == 'true'
+SMTP_FROM = os.environ.get('CONTACT_NOTIFY_FROM', 'portfolio@localhost')
+SMTP_TO = os.environ.get('CONTACT_NOTIFY_TO', '')
+
+# JSON webhook for new contact messages; signed with HMAC-SHA256 when a secret is set
+WEBHOOK_URL = os.environ.get('CONTACT_NOTIFY_WEBHOOK_URL', '')
+WEBHOOK_SECRET = os.environ.get('CONTACT_NOTIFY_WEBHOOK_SECRET', '')
+
+NOTIFY_TIMEOUT = float(os.environ.get('CONTACT_NOTIFY_TIMEOUT_SECONDS', '10'))
+
+
+class SMTPNotifier:
+    """Emails the site owner about a new contact message"""
+
+    name = "email"
+
+    def __init__(
+        self,
+        host=SMTP_HOST,
+        port=SMTP_PORT,
+        sender=SMTP_FROM,
+        recipient=SMTP_TO,
+        username=SMTP_USERNAME,
+        password=SMTP_PASSWORD,
+        starttls=SMTP_STARTTLS,
+        timeout=NOTIFY_TIMEOUT
+    ):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipient = recipient
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def build(self, message):
+        email = EmailMessage()
+        email["Subject"] = f"New contact message: {message['subject']}"
+        email["From"] = self.sender
+        email["To"] = self.recipient
+        email["Reply-To"] = message["email"]
+        email.set_content(
+            f"From: {message['name']} <{message['email']}>\n"
+            f"Received: {message['timestamp']}\n"
+            f"Message id: {message['id']}\n\n"
+            f"{message['message']}\n"
+        )
+        return email
+
+    def _send(self, email):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(email)
+
+    async def deliver(self, message):
+        # smtplib blocks, so it runs on the default executor
+        await asyncio.to_thread(self._send, self.build(message))
+
+
+class WebhookNotifier:
+    """POSTs a new contact message as JSON to a webhook"""
+
+    name = "webhook"
+
+    def __init__(self, url=WEBHOOK_URL, secret=WEBHOOK_SECRET, timeout=NOTIFY_TIMEOUT):
+        self.url = url
+        self.secret = secret
+        self.timeout = timeout
+
+    def build(self, message):
+        body = json.dumps({"event": "contact_message.created", "message": message}).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.secret:
+            signature = hmac.new(self.secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+            headers["X-Signature-SHA256"] = signature
+        return urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+
+    def _send(self, request):
+        # urlopen raises HTTPError for non-2xx answers, which counts as a failed attempt
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    async def deliver(self, message):
+        await asyncio.to_thread(self._send, self.build(message))
+
+
+def configured_notifiers():
+    """Notifiers enabled by the environment, keyed by name"""
+    notifiers = []
+    if SMTP_HOST and SMTP_TO:
+        notifiers.append(SMTPNotifier())
+    if WEBHOOK_URL:
+        notifiers.append(WebhookNotifier())
+    return {notifier.name: notifier for notifier in notifiers}
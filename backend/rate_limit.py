@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from fastapi import HTTPException, Request, status
+from metrics import registry
+import math
+import os
+import threading
+import time
+
+# Contact form throttling; a rate of 0 disables that limiter
+RATE_LIMIT_ENABLED = os.environ.get('CONTACT_RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+# Off by default: behind a proxy every visitor shares the proxy's address
+# unless TRUSTED_PROXY_HOPS is set, so enable it together with that
+IP_RATE_PER_MINUTE = float(os.environ.get('CONTACT_RATE_LIMIT_PER_MINUTE', '0'))
+IP_BURST = float(os.environ.get('CONTACT_RATE_LIMIT_BURST', '5'))
+EMAIL_RATE_PER_HOUR = float(os.environ.get('CONTACT_EMAIL_RATE_LIMIT_PER_HOUR', '0'))
+EMAIL_BURST = float(os.environ.get('CONTACT_EMAIL_RATE_LIMIT_BURST', '3'))
+# Process-wide ceiling that sheds load during a spam wave from many addresses
+GLOBAL_RATE_PER_SECOND = float(os.environ.get('CONTACT_GLOBAL_RATE_PER_SECOND', '0'))
+GLOBAL_BURST = float(os.environ.get('CONTACT_GLOBAL_RATE_BURST', '50'))
+MAX_TRACKED_CLIENTS = int(os.environ.get('CONTACT_RATE_LIMIT_MAX_CLIENTS', '10000'))
+# Number of proxies in front of the app that append to X-Forwarded-For (1 for
+# a single ingress); 0 ignores the header and uses the connecting address
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', '0'))
+
+rate_limit_decisions = registry.counter(
+    "contact_rate_limit_decisions_total",
+    "Contact form rate limiter decisions by limiter and outcome",
+    ("limiter", "outcome"),
+)
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets, keeping at most max_keys buckets in LRU order"""
+
+    def __init__(self, name, rate_per_second, burst, max_keys=MAX_TRACKED_CLIENTS):
+        self.name = name
+        self.rate = rate_per_second
+        self.burst = max(1.0, burst)
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return RATE_LIMIT_ENABLED and self.rate > 0
+
+    def acquire(self, key):
+        """Take one token for key; return seconds to wait, or 0 when allowed"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                retry_after = 0.0
+            else:
+                retry_after = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            # A forgotten bucket only resets that client to a full burst
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        rate_limit_decisions.inc(limiter=self.name, outcome="limited" if retry_after else "allowed")
+        return retry_after
+
+    def check(self, key):
+        """Raise a 429 with Retry-After when key has no tokens left"""
+        if not self.enabled:
+            return
+        retry_after = self.acquire(key)
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests. Please try again later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+
+    def tracked(self):
+        with self._lock:
+            return len(self._buckets)
+
+
+ip_limiter = TokenBucketLimiter("ip", IP_RATE_PER_MINUTE / 60, IP_BURST)
+email_limiter = TokenBucketLimiter("email", EMAIL_RATE_PER_HOUR / 3600, EMAIL_BURST)
+global_limiter = TokenBucketLimiter("global", GLOBAL_RATE_PER_SECOND, GLOBAL_BURST, max_keys=1)
+
+
+def client_ip(request: Request, trusted_hops=TRUSTED_PROXY_HOPS):
+    """Address of the client as seen by the outermost trusted proxy
+
+    Each proxy appends the address it received the request from, so the
+    entries a client sends itself sit to the left. Counting trusted_hops
+    from the right gives the first address no trusted proxy vouches for.
+    """
+    if trusted_hops > 0:
+        forwarded = [
+            hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",")
+            if hop.strip()
+        ]
+        if len(forwarded) >= trusted_hops:
+            return forwarded[-trusted_hops]
+    return request.client.host if request.client else "unknown"
+
+
+async def contact_rate_limit(request: Request):
+    """Dependency that throttles before the body is validated or any DB work"""
+    global_limiter.check("*")
+    ip_limiter.check(client_ip(request))
+
+
+def check_email_rate(email):
+    """Throttle repeated submissions from one address once the body is validated"""
+    email_limiter.check(email.lower())
+
+
+def _limiter_metrics():
+    return [
+        ("contact_rate_limit_tracked_clients", "gauge", "Clients with a live token bucket",
+         [({"limiter": limiter.name}, limiter.tracked()) for limiter in (ip_limiter, email_limiter)]),
+    ]
+
+
+registry.add_collector(_limiter_metrics)
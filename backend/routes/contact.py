@@ -1,25 +1,162 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List
-from models import ContactMessage, ContactMessageCreate, ContactMessageResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pymongo.errors import DuplicateKeyError
+from typing import List, Optional
+from datetime import datetime, timedelta
+from models import (
+    ContactMessage,
+    ContactMessageCreate,
+    ContactMessageResponse,
+    ContactMessagePage,
+    from_documents,
+)
 from database import contact_messages
+from contact_writer import contact_writer
+from contact_outbox import contact_outbox
+from rate_limit import contact_rate_limit, check_email_rate
+from json_encoding import dumps
+from server_timing import phase
+import base64
+import binascii
+import csv
+import io
+import hashlib
+import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/contact", tags=["contact"])
 
-@router.post("/", response_model=ContactMessageResponse)
-async def create_contact_message(message_data: ContactMessageCreate):
-    """Create a new contact message"""
+# Identical submissions inside the same window are treated as one message
+DUPLICATE_WINDOW_SECONDS = int(os.environ.get('CONTACT_DUPLICATE_WINDOW_SECONDS', '600'))
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+VALID_STATUSES = ["unread", "read", "replied"]
+EXPORT_FIELDS = list(ContactMessageResponse.model_fields)
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+def _content_hash(message, windows_back=0):
+    """Hash email, subject and message together with the duplicate window they fall in"""
+    window = int(message.timestamp.timestamp()) // max(1, DUPLICATE_WINDOW_SECONDS) - windows_back
+    raw = "\x1f".join([
+        message.email.lower(),
+        message.subject.strip(),
+        message.message.strip(),
+        str(window),
+    ])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+async def _find_original(contact_message):
+    """Look up the stored or buffered message a duplicate insert collided with"""
+    buffered = contact_writer.find_buffered(
+        contact_message.idempotency_key, contact_message.content_hash
+    )
+    if buffered:
+        return buffered
+    clauses = [{"content_hash": contact_message.content_hash}]
+    if contact_message.idempotency_key:
+        clauses.insert(0, {"idempotency_key": contact_message.idempotency_key})
+    return await contact_messages.find_one({"$or": clauses})
+
+async def _find_recent_duplicate(contact_message):
+    """Look up an identical message from the previous window sent less than a window ago
+
+    Windows are fixed buckets, so a copy sent just before a boundary hashes
+    differently and the unique index alone would let both through.
+    """
+    previous_hash = _content_hash(contact_message, windows_back=1)
+    buffered = contact_writer.find_buffered(None, previous_hash)
+    if buffered:
+        return buffered
+    since = contact_message.timestamp - timedelta(seconds=DUPLICATE_WINDOW_SECONDS)
+    return await contact_messages.find_one(
+        {"content_hash": previous_hash, "timestamp": {"$gte": since}}
+    )
+
+def _replay(response, original):
+    logger.info(f"Duplicate contact message suppressed, replaying: {original['id']}")
+    response.headers["Idempotent-Replayed"] = "true"
+    return ContactMessageResponse(**original)
+
+def _encode_cursor(message):
+    """Build an opaque cursor pointing just past the given message"""
+    raw = json.dumps({"t": message["timestamp"].isoformat(), "id": message["id"]})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor):
+    """Turn an opaque cursor back into a (timestamp, id) pair"""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    raw = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    return datetime.fromisoformat(raw["t"]), str(raw["id"])
+
+@router.post(
+    "/",
+    response_model=ContactMessageResponse,
+    dependencies=[Depends(contact_rate_limit)]
+)
+async def create_contact_message(
+    message_data: ContactMessageCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None)
+):
+    """Create a new contact message, replaying the original for retried submissions"""
     try:
+        if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Idempotency-Key must be 1-{MAX_IDEMPOTENCY_KEY_LENGTH} characters"
+            )
+        
+        check_email_rate(message_data.email)
+        
         # Create contact message
-        contact_message = ContactMessage(**message_data.dict())
+        with phase("validation"):
+            contact_message = ContactMessage(**message_data.dict(), idempotency_key=idempotency_key)
+            contact_message.content_hash = _content_hash(contact_message)
+            # Post-processing is recorded on the message itself, so it is stored
+            # in the same write and the outbox picks it up even after a crash
+            contact_message.pending_handlers = contact_outbox.handler_names or None
+        
+        with phase("mongo"):
+            original = await _find_recent_duplicate(contact_message)
+        if original:
+            return _replay(response, original)
         
-        # Insert into database
-        result = await contact_messages.insert_one(contact_message.dict())
+        # Unset optional fields are left out so the sparse unique indexes skip them
+        document = contact_message.dict(exclude_none=True)
         
-        if result.inserted_id:
+        # Insert into database, through the batching writer when it is running;
+        # the unique indexes reject retries and double submissions
+        try:
+            with phase("mongo"):
+                if contact_writer.running:
+                    # In enqueue mode the id is returned before the insert runs, so
+                    # an already stored copy has to be found up front. Two copies
+                    # racing past this check and a flush are still dropped at flush time
+                    if contact_writer.ack_mode == "enqueue" and await _find_original(contact_message):
+                        raise DuplicateKeyError("Contact message already stored", 11000)
+                    inserted_id = await contact_writer.submit(document)
+                else:
+                    result = await contact_messages.insert_one(document)
+                    inserted_id = result.inserted_id
+        except DuplicateKeyError:
+            with phase("mongo"):
+                original = await _find_original(contact_message)
+            if not original:
+                raise
+            return _replay(response, original)
+        
+        if inserted_id:
             logger.info(f"Contact message created: {contact_message.id}")
             
+            # Notifications run on the outbox workers, so the request doesn't
+            # wait for SMTP or webhooks
+            contact_outbox.wake()
+            
             # Return response without sensitive data
             return ContactMessageResponse(**contact_message.dict())
         else:
@@ -28,6 +165,8 @@ async def create_contact_message(message_data: ContactMessageCreate):
                 detail="Failed to create contact message"
             )
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating contact message: {e}")
         raise HTTPException(
@@ -40,9 +179,11 @@ async def get_contact_messages(skip: int = 0, limit: int = 50):
     """Get all contact messages (admin endpoint)"""
     try:
         cursor = contact_messages.find().sort("timestamp", -1).skip(skip).limit(limit)
-        messages = await cursor.to_list(length=limit)
+        with phase("mongo"):
+            messages = await cursor.to_list(length=limit)
         
-        return [ContactMessageResponse(**msg) for msg in messages]
+        with phase("validation"):
+            return from_documents(ContactMessageResponse, messages)
         
     except Exception as e:
         logger.error(f"Error fetching contact messages: {e}")
@@ -51,11 +192,149 @@ async def get_contact_messages(skip: int = 0, limit: int = 50):
             detail="Internal server error"
         )
 
+@router.get("/inbox", response_model=ContactMessagePage)
+async def get_contact_inbox(cursor: Optional[str] = None, limit: int = 50):
+    """Get contact messages newest first using keyset pagination (admin endpoint)"""
+    try:
+        limit = max(1, min(limit, 500))
+        query = {}
+        if cursor:
+            try:
+                timestamp, message_id = _decode_cursor(cursor)
+            except (binascii.Error, ValueError, KeyError, TypeError):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+            # Seek past the last message of the previous page using the
+            # (timestamp, id) compound index instead of skipping entries
+            query = {
+                "$or": [
+                    {"timestamp": {"$lt": timestamp}},
+                    {"timestamp": timestamp, "id": {"$lt": message_id}},
+                ]
+            }
+        
+        db_cursor = contact_messages.find(query).sort(
+            [("timestamp", -1), ("id", -1)]
+        ).limit(limit + 1)
+        with phase("mongo"):
+            messages = await db_cursor.to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(messages) > limit:
+            messages = messages[:limit]
+            next_cursor = _encode_cursor(messages[-1])
+        
+        with phase("validation"):
+            return ContactMessagePage(
+                messages=from_documents(ContactMessageResponse, messages),
+                next_cursor=next_cursor
+            )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching contact inbox: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+def _export_row(message):
+    row = {field: message.get(field) for field in EXPORT_FIELDS}
+    if isinstance(row["timestamp"], datetime):
+        row["timestamp"] = row["timestamp"].isoformat()
+    return row
+
+async def _export_chunks(query, export_format, batch_size):
+    """Yield encoded rows straight off the Motor cursor, one batch at a time"""
+    projection = {field: 1 for field in EXPORT_FIELDS}
+    projection["_id"] = 0
+    cursor = contact_messages.find(query, projection).sort(
+        [("timestamp", -1), ("id", -1)]
+    ).batch_size(batch_size)
+    
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS) if export_format == "csv" else None
+    if writer:
+        writer.writeheader()
+    
+    chunk = []
+    exported = 0
+    try:
+        async for message in cursor:
+            row = _export_row(message)
+            if writer:
+                writer.writerow(row)
+            else:
+                chunk.append(dumps(row) + b"\n")
+            exported += 1
+            
+            if exported % batch_size == 0:
+                if writer:
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate()
+                else:
+                    yield b"".join(chunk)
+                    chunk = []
+        
+        if writer:
+            yield buffer.getvalue().encode("utf-8")
+        elif chunk:
+            yield b"".join(chunk)
+        logger.info(f"Exported {exported} contact messages as {export_format}")
+        
+    except Exception as e:
+        # Headers are already sent, so the client sees a truncated stream
+        logger.error(f"Error exporting contact messages after {exported} rows: {e}")
+        raise
+
+@router.get("/export")
+async def export_contact_messages(
+    format: str = "ndjson",
+    batch_size: int = 500,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    status_filter: Optional[str] = Query(default=None, alias="status")
+):
+    """Stream contact messages as NDJSON or CSV without buffering the inbox (admin endpoint)"""
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid format. Must be one of: {list(EXPORT_FORMATS)}"
+        )
+    if status_filter is not None and status_filter not in VALID_STATUSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid status. Must be one of: {VALID_STATUSES}"
+        )
+    
+    query = {}
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = since
+        if until:
+            query["timestamp"]["$lt"] = until
+    if status_filter:
+        query["status"] = status_filter
+    
+    batch_size = max(1, min(batch_size, 10000))
+    filename = f"contact_messages.{format}"
+    return StreamingResponse(
+        _export_chunks(query, format, batch_size),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/{message_id}", response_model=ContactMessageResponse)
 async def get_contact_message(message_id: str):
     """Get specific contact message"""
     try:
-        message = await contact_messages.find_one({"id": message_id})
+        with phase("mongo"):
+            message = await contact_messages.find_one({"id": message_id})
         
         if not message:
             raise HTTPException(
@@ -63,7 +342,8 @@ async def get_contact_message(message_id: str):
                 detail="Contact message not found"
             )
             
-        return ContactMessageResponse(**message)
+        with phase("validation"):
+            return ContactMessageResponse(**message)
         
     except HTTPException:
         raise
@@ -78,17 +358,17 @@ async def get_contact_message(message_id: str):
 async def update_message_status(message_id: str, status: str):
     """Update message status (admin endpoint)"""
     try:
-        valid_statuses = ["unread", "read", "replied"]
-        if status not in valid_statuses:
+        if status not in VALID_STATUSES:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status. Must be one of: {valid_statuses}"
+                detail=f"Invalid status. Must be one of: {VALID_STATUSES}"
             )
         
-        result = await contact_messages.update_one(
-            {"id": message_id},
-            {"$set": {"status": status}}
-        )
+        with phase("mongo"):
+            result = await contact_messages.update_one(
+                {"id": message_id},
+                {"$set": {"status": status}}
+            )
         
         if result.matched_count == 0:
             raise HTTPException(
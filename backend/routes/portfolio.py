@@ -1,26 +1,287 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import List, Optional
-from models import Project, Experience, TechnicalExpertise
-from database import projects, experiences, technical_expertise
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from typing import List, Optional, Union
+from models import (
+    Project,
+    ProjectSummary,
+    Experience,
+    TechnicalExpertise,
+    SearchResponse,
+    PortfolioBundle,
+    PROJECT_FIELD_PRESETS,
+    from_documents,
+    project_model_for,
+)
+from database import (
+    projects,
+    experiences,
+    technical_expertise,
+    load_portfolio_stats,
+    load_portfolio_version,
+)
+from cache import portfolio_cache, portfolio_version, cache_key, invalidate_portfolio_cache
+from http_cache import CachedPayload, conditional_response, version_time
+from snapshot_store import portfolio_snapshot
+from server_timing import annotate, phase
+from search_index import portfolio_search, SEARCH_COLLECTIONS
+from urllib.parse import quote, urlencode
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/portfolio", tags=["portfolio"])
 
-# Projects endpoints
-@router.get("/projects", response_model=List[Project])
-async def get_projects(category: Optional[str] = None, limit: int = 50):
-    """Get all projects, optionally filtered by category"""
-    try:
-        query = {}
-        if category:
-            query["category"] = category
-            
-        cursor = projects.find(query).sort("created_at", -1).limit(limit)
+DEFAULT_PROJECT_LIMIT = 50
+
+def _resolve_project_fields(fields):
+    """Turn a ?fields= value (preset name or comma list) into Project field names"""
+    if fields is None:
+        return PROJECT_FIELD_PRESETS["full"]
+    if fields in PROJECT_FIELD_PRESETS:
+        return PROJECT_FIELD_PRESETS[fields]
+    
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    if not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No project fields requested. "
+                   f"Use a preset {list(PROJECT_FIELD_PRESETS)} or any of {list(Project.model_fields)}"
+        )
+    unknown = requested - set(Project.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown project fields: {sorted(unknown)}. "
+                   f"Use a preset {list(PROJECT_FIELD_PRESETS)} or any of {list(Project.model_fields)}"
+        )
+    
+    # Always include the id so rows stay addressable
+    requested.add("id")
+    return [name for name in Project.model_fields if name in requested]
+
+async def _check_data_version():
+    """Drop cached responses and the search index once the seeder stored new data"""
+    if await portfolio_version.check(load_portfolio_version):
+        portfolio_search.invalidate()
+
+async def _get_or_load(key, load):
+    """Serve from the shared snapshot file when it has key, else the process cache"""
+    await _check_data_version()
+    payload = portfolio_snapshot.get(key)
+    if payload is not None:
+        annotate("cache", "snapshot")
+        return payload
+    
+    missed = False
+    
+    async def load_on_miss():
+        nonlocal missed
+        missed = True
+        annotate("cache", "miss")
+        # Read before the data, so Last-Modified never claims a newer version
+        # than the body it is sent with
+        with phase("mongo"):
+            version = await load_portfolio_version()
+        payload = await load()
+        payload.last_modified = version_time(version)
+        return payload
+    
+    payload = await portfolio_cache.get_or_load(key, load_on_miss)
+    if not missed:
+        annotate("cache", "hit")
+    return payload
+
+# Uncached queries, used by the cached loaders and the snapshot builder
+async def _query_projects(category, limit, field_names):
+    model = project_model_for(tuple(field_names))
+    query = {}
+    if category:
+        query["category"] = category
+    
+    # Only pull the requested fields over the wire
+    projection = {name: 1 for name in field_names}
+    projection["_id"] = 0
+        
+    cursor = projects.find(query, projection).sort("created_at", -1).limit(limit)
+    with phase("mongo"):
         project_list = await cursor.to_list(length=limit)
+    
+    with phase("validation"):
+        data = from_documents(model, project_list)
+    return CachedPayload(data)
+
+async def _query_project(project_id):
+    with phase("mongo"):
+        project = await projects.find_one({"id": project_id})
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
         
-        return [Project(**project) for project in project_list]
+    with phase("validation"):
+        data = Project(**project)
+    return CachedPayload(data)
+
+async def _query_experience():
+    # Current roles (no end_date) first among entries starting in the same month
+    cursor = experiences.find().sort([("start_date", -1), ("is_current", -1), ("end_date", -1)])
+    with phase("mongo"):
+        experience_list = await cursor.to_list(length=None)
+    
+    with phase("validation"):
+        data = from_documents(Experience, experience_list)
+    return CachedPayload(data)
+
+async def _query_expertise(category):
+    query = {}
+    if category:
+        query["category"] = category
+        
+    cursor = technical_expertise.find(query)
+    with phase("mongo"):
+        expertise_list = await cursor.to_list(length=None)
+    
+    with phase("validation"):
+        data = from_documents(TechnicalExpertise, expertise_list)
+    return CachedPayload(data)
+
+async def _query_stats():
+    # Single read of the stats document the seeder materializes
+    with phase("mongo"):
+        stats = await load_portfolio_stats()
+    
+    return CachedPayload({
+        "total_projects": stats["total_projects"],
+        "total_experience_entries": stats["total_experience_entries"],
+        "total_expertise_areas": stats["total_expertise_areas"],
+        "project_categories": stats["project_categories"],
+        "years_experience": 4,  # Based on provided information
+        "google_projects": "10+",
+        "specialization": "CCAI & Dialogflow CX"
+    })
+
+def _bundle(projects_part, experience_part, expertise_part, stats_part):
+    return CachedPayload({
+        "projects": projects_part.data,
+        "experience": experience_part.data,
+        "expertise": expertise_part.data,
+        "stats": stats_part.data,
+    })
+
+def _projects_key(category, limit, field_names):
+    return cache_key(
+        "projects", category=category, limit=limit, fields=",".join(field_names)
+    )
+
+def _bundle_key(category, limit, field_names, expertise_category):
+    return cache_key(
+        "bundle",
+        category=category,
+        limit=limit,
+        fields=",".join(field_names),
+        expertise_category=expertise_category
+    )
+
+# Cached loaders shared by the individual endpoints and the bundle
+async def _projects_payload(category, limit, field_names):
+    key = _projects_key(category, limit, field_names)
+    return await _get_or_load(key, lambda: _query_projects(category, limit, field_names))
+
+async def _project_payload(project_id):
+    key = cache_key("project", id=project_id)
+    return await _get_or_load(key, lambda: _query_project(project_id))
+
+async def _experience_payload():
+    return await _get_or_load(cache_key("experience"), _query_experience)
+
+async def _expertise_payload(category):
+    key = cache_key("expertise", category=category)
+    return await _get_or_load(key, lambda: _query_expertise(category))
+
+async def _stats_payload():
+    return await _get_or_load(cache_key("stats"), _query_stats)
+
+def _url(path, **params):
+    query = urlencode({name: value for name, value in params.items() if value is not None})
+    return f"{router.prefix}{path}" + (f"?{query}" if query else "")
+
+async def render_static_responses(limit=DEFAULT_PROJECT_LIMIT):
+    """Render every parameter-free portfolio response as (url, cache key, payload)
+
+    Covers the default and per-category /projects and /expertise lists, each
+    project, experience, stats and the default bundle. Reads Mongo directly so
+    the result never comes from a stale cache or snapshot.
+    """
+    full = PROJECT_FIELD_PRESETS["full"]
+    last_modified = version_time(await load_portfolio_version())
+    project_categories = await projects.distinct("category")
+    expertise_categories = await technical_expertise.distinct("category")
+    project_ids = await projects.distinct("id")
+    
+    rendered = []
+    all_projects = await _query_projects(None, limit, full)
+    rendered.append((_url("/projects"), _projects_key(None, limit, full), all_projects))
+    for category in sorted(project_categories):
+        rendered.append((
+            _url("/projects", category=category),
+            _projects_key(category, limit, full),
+            await _query_projects(category, limit, full)
+        ))
+    for project_id in sorted(project_ids):
+        rendered.append((
+            _url(f"/projects/{quote(project_id, safe='')}"),
+            cache_key("project", id=project_id),
+            await _query_project(project_id)
+        ))
+    
+    experience_part = await _query_experience()
+    rendered.append((_url("/experience"), cache_key("experience"), experience_part))
+    expertise_part = await _query_expertise(None)
+    rendered.append((_url("/expertise"), cache_key("expertise"), expertise_part))
+    for category in sorted(expertise_categories):
+        rendered.append((
+            _url("/expertise", category=category),
+            cache_key("expertise", category=category),
+            await _query_expertise(category)
+        ))
+    
+    stats_part = await _query_stats()
+    rendered.append((_url("/stats"), cache_key("stats"), stats_part))
+    rendered.append((
+        _url("/bundle"),
+        _bundle_key(None, limit, full, None),
+        _bundle(all_projects, experience_part, expertise_part, stats_part)
+    ))
+    for _, _, payload in rendered:
+        payload.last_modified = last_modified
+    return rendered
+
+async def snapshot_payloads(limit=DEFAULT_PROJECT_LIMIT):
+    """Parameter-free portfolio responses keyed like the cache, for the shared snapshot"""
+    return {key: payload for _, key, payload in await render_static_responses(limit)}
+
+# Projects endpoints
+@router.get("/projects", response_model=Union[List[Project], List[ProjectSummary]])
+async def get_projects(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    limit: int = DEFAULT_PROJECT_LIMIT,
+    fields: Optional[str] = None
+):
+    """Get all projects, optionally filtered by category and trimmed to a sparse fieldset"""
+    try:
+        field_names = _resolve_project_fields(fields)
+        payload = await _projects_payload(category, limit, field_names)
+        return conditional_response(
+            request, response, payload,
+            raw=project_model_for(tuple(field_names)) not in (Project, ProjectSummary)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching projects: {e}")
         raise HTTPException(
@@ -29,18 +290,11 @@ async def get_projects(category: Optional[str] = None, limit: int = 50):
         )
 
 @router.get("/projects/{project_id}", response_model=Project)
-async def get_project(project_id: str):
+async def get_project(project_id: str, request: Request, response: Response):
     """Get specific project details"""
     try:
-        project = await projects.find_one({"id": project_id})
-        
-        if not project:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Project not found"
-            )
-            
-        return Project(**project)
+        payload = await _project_payload(project_id)
+        return conditional_response(request, response, payload)
         
     except HTTPException:
         raise
@@ -53,13 +307,11 @@ async def get_project(project_id: str):
 
 # Experience endpoints
 @router.get("/experience", response_model=List[Experience])
-async def get_experience():
+async def get_experience(request: Request, response: Response):
     """Get all work experience"""
     try:
-        cursor = experiences.find().sort("period", -1)
-        experience_list = await cursor.to_list(length=None)
-        
-        return [Experience(**exp) for exp in experience_list]
+        payload = await _experience_payload()
+        return conditional_response(request, response, payload)
         
     except Exception as e:
         logger.error(f"Error fetching experience: {e}")
@@ -70,17 +322,15 @@ async def get_experience():
 
 # Technical expertise endpoints
 @router.get("/expertise", response_model=List[TechnicalExpertise])
-async def get_technical_expertise(category: Optional[str] = None):
+async def get_technical_expertise(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None
+):
     """Get technical expertise, optionally filtered by category"""
     try:
-        query = {}
-        if category:
-            query["category"] = category
-            
-        cursor = technical_expertise.find(query)
-        expertise_list = await cursor.to_list(length=None)
-        
-        return [TechnicalExpertise(**expertise) for expertise in expertise_list]
+        payload = await _expertise_payload(category)
+        return conditional_response(request, response, payload)
         
     except Exception as e:
         logger.error(f"Error fetching technical expertise: {e}")
@@ -90,29 +340,103 @@ async def get_technical_expertise(category: Optional[str] = None):
         )
 
 @router.get("/stats")
-async def get_portfolio_stats():
+async def get_portfolio_stats(request: Request, response: Response):
     """Get portfolio statistics"""
     try:
-        project_count = await projects.count_documents({})
-        experience_count = await experiences.count_documents({})
-        expertise_count = await technical_expertise.count_documents({})
+        payload = await _stats_payload()
+        return conditional_response(request, response, payload)
+        
+    except Exception as e:
+        logger.error(f"Error fetching portfolio stats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+# Bundle endpoint
+@router.get("/bundle", response_model=PortfolioBundle)
+async def get_portfolio_bundle(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    limit: int = DEFAULT_PROJECT_LIMIT,
+    fields: Optional[str] = None,
+    expertise_category: Optional[str] = None
+):
+    """Get projects, experience, expertise and stats in one response"""
+    try:
+        field_names = _resolve_project_fields(fields)
         
-        # Get project categories
-        project_categories = await projects.distinct("category")
+        async def load():
+            # Each part goes through its own cache entry, so the bundle shares
+            # warm data with the individual endpoints
+            parts = await asyncio.gather(
+                _projects_payload(category, limit, field_names),
+                _experience_payload(),
+                _expertise_payload(expertise_category),
+                _stats_payload(),
+            )
+            return _bundle(*parts)
         
-        return {
-            "total_projects": project_count,
-            "total_experience_entries": experience_count,
-            "total_expertise_areas": expertise_count,
-            "project_categories": project_categories,
-            "years_experience": 4,  # Based on provided information
-            "google_projects": "10+",
-            "specialization": "CCAI & Dialogflow CX"
-        }
+        key = _bundle_key(category, limit, field_names, expertise_category)
+        payload = await _get_or_load(key, load)
+        return conditional_response(
+            request, response, payload,
+            raw=project_model_for(tuple(field_names)) not in (Project, ProjectSummary)
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error fetching portfolio stats: {e}")
+        logger.error(f"Error fetching portfolio bundle: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
-        )
\ No newline at end of file
+        )
+
+# Search endpoints
+@router.get("/search", response_model=SearchResponse)
+async def search_portfolio(q: str, type: Optional[str] = None, limit: int = 20):
+    """Full-text search across projects, experience and expertise"""
+    try:
+        if type is not None and type not in SEARCH_COLLECTIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid type. Must be one of: {list(SEARCH_COLLECTIONS)}"
+            )
+        
+        await _check_data_version()
+        started = time.perf_counter()
+        with phase("search"):
+            results = await portfolio_search.search(q, max(1, min(limit, 100)), type)
+        
+        return SearchResponse(
+            query=q,
+            engine=portfolio_search.engine,
+            total=len(results),
+            took_ms=round((time.perf_counter() - started) * 1000, 3),
+            results=results
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching portfolio: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+# Cache management endpoints
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Get portfolio cache hit/miss counters (admin endpoint)"""
+    return portfolio_cache.stats()
+
+@router.post("/cache/invalidate")
+async def invalidate_cache(route: Optional[str] = None):
+    """Drop cached portfolio responses, optionally only for one route (admin endpoint)"""
+    removed = invalidate_portfolio_cache(route)
+    portfolio_search.invalidate()
+    logger.info(f"Portfolio cache invalidated: route={route}, removed={removed}")
+    return {"message": "Cache invalidated", "removed": removed}
@@ -0,0 +1,236 @@
+from collections import defaultdict
+from database import projects, experiences, technical_expertise
+from indexes import SEARCH_FIELDS as COLLECTION_SEARCH_FIELDS
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Above this many documents the index is not held in memory and searches
+# fall back to the Mongo text indexes created by init_database
+SEARCH_MAX_MEMORY_DOCS = int(os.environ.get('SEARCH_MAX_MEMORY_DOCS', '50000'))
+# How long an in-memory index is trusted before it is re-synced with Mongo
+SEARCH_REFRESH_SECONDS = float(os.environ.get('SEARCH_REFRESH_SECONDS', '300'))
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+# Searchable fields per document type with their ranking weight, shared with
+# the Mongo text indexes
+SEARCH_FIELDS = {
+    "project": COLLECTION_SEARCH_FIELDS["projects"],
+    "experience": COLLECTION_SEARCH_FIELDS["experiences"],
+    "expertise": COLLECTION_SEARCH_FIELDS["technical_expertise"],
+}
+
+SEARCH_COLLECTIONS = {
+    "project": projects,
+    "experience": experiences,
+    "expertise": technical_expertise,
+}
+
+
+def tokenize(text):
+    """Lowercase text and split it into search tokens"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _field_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value)
+    return str(value)
+
+
+def _result_title(doc_type, doc):
+    if doc_type == "experience":
+        return f"{doc.get('role', '')} at {doc.get('company', '')}"
+    return doc.get("title", "")
+
+
+def _result_summary(doc_type, doc):
+    if doc_type == "experience":
+        achievements = doc.get("achievements") or []
+        return achievements[0] if achievements else doc.get("period", "")
+    return doc.get("description", "")
+
+
+def _content_hash(doc_type, doc):
+    fields = {name: doc.get(name) for name in SEARCH_FIELDS[doc_type]}
+    raw = json.dumps(fields, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+
+class InvertedIndex:
+    """Weighted token -> document postings for the portfolio collections"""
+
+    def __init__(self):
+        self._postings = defaultdict(dict)
+        self._doc_tokens = {}
+        self._doc_hashes = {}
+        self._doc_info = {}
+
+    def __len__(self):
+        return len(self._doc_info)
+
+    def add(self, doc_type, doc):
+        """Index a document, replacing any previous version of it"""
+        key = (doc_type, doc["id"])
+        self.remove(key)
+
+        weights = defaultdict(float)
+        for field, weight in SEARCH_FIELDS[doc_type].items():
+            for token in tokenize(_field_text(doc.get(field))):
+                weights[token] += weight
+
+        for token, weight in weights.items():
+            self._postings[token][key] = weight
+        self._doc_tokens[key] = list(weights)
+        self._doc_hashes[key] = _content_hash(doc_type, doc)
+        self._doc_info[key] = {
+            "type": doc_type,
+            "id": doc["id"],
+            "title": _result_title(doc_type, doc),
+            "summary": _result_summary(doc_type, doc),
+        }
+
+    def remove(self, key):
+        """Drop a (type, id) document from the index if present"""
+        for token in self._doc_tokens.pop(key, []):
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(key, None)
+                if not postings:
+                    del self._postings[token]
+        self._doc_hashes.pop(key, None)
+        self._doc_info.pop(key, None)
+
+    def sync(self, doc_type, docs):
+        """Bring one document type in line with docs, touching only what changed"""
+        seen = set()
+        changed = 0
+        for doc in docs:
+            key = (doc_type, doc["id"])
+            seen.add(key)
+            if self._doc_hashes.get(key) != _content_hash(doc_type, doc):
+                self.add(doc_type, doc)
+                changed += 1
+
+        stale = [key for key in self._doc_info if key[0] == doc_type and key not in seen]
+        for key in stale:
+            self.remove(key)
+        return changed + len(stale)
+
+    def search(self, query, limit=20, doc_type=None):
+        """Rank documents by summed token weight scaled by inverse document frequency"""
+        scores = defaultdict(float)
+        total = len(self._doc_info) or 1
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for key, weight in postings.items():
+                if doc_type is None or key[0] == doc_type:
+                    scores[key] += weight * idf
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [
+            {**self._doc_info[key], "score": round(score, 4)}
+            for key, score in ranked
+        ]
+
+
+class PortfolioSearch:
+    """In-memory search with a Mongo $text fallback for large corpora"""
+
+    def __init__(self):
+        self.index = InvertedIndex()
+        self.in_memory = True
+        self.built_at = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def engine(self):
+        return "memory" if self.in_memory else "mongo"
+
+    @property
+    def stale(self):
+        return self.built_at is None or time.monotonic() - self.built_at > SEARCH_REFRESH_SECONDS
+
+    async def refresh(self, only_if_stale=False):
+        """Incrementally re-sync the in-memory index with the collections"""
+        async with self._lock:
+            # Searches that queued behind a re-sync find the index fresh
+            if only_if_stale and not self.stale:
+                return 0
+            counts = await asyncio.gather(
+                *(collection.estimated_document_count() for collection in SEARCH_COLLECTIONS.values())
+            )
+            if sum(counts) > SEARCH_MAX_MEMORY_DOCS:
+                if self.in_memory:
+                    logger.info(
+                        f"Search corpus has {sum(counts)} documents, using Mongo text indexes"
+                    )
+                self.index = InvertedIndex()
+                self.in_memory = False
+                self.built_at = time.monotonic()
+                return 0
+
+            changed = 0
+            for doc_type, collection in SEARCH_COLLECTIONS.items():
+                projection = {name: 1 for name in SEARCH_FIELDS[doc_type]}
+                projection.update({"_id": 0, "id": 1, "period": 1})
+                docs = await collection.find({}, projection).to_list(length=None)
+                changed += self.index.sync(doc_type, docs)
+
+            self.in_memory = True
+            self.built_at = time.monotonic()
+            logger.info(f"Search index synced: {len(self.index)} documents, {changed} changed")
+            return changed
+
+    def invalidate(self):
+        """Force the next search to re-sync with Mongo"""
+        self.built_at = None
+
+    async def search(self, query, limit=20, doc_type=None):
+        if self.stale:
+            await self.refresh(only_if_stale=True)
+
+        if self.in_memory:
+            return self.index.search(query, limit, doc_type)
+        return await self._search_mongo(query, limit, doc_type)
+
+    async def _search_mongo(self, query, limit, doc_type):
+        doc_types = [doc_type] if doc_type else list(SEARCH_COLLECTIONS)
+
+        async def search_collection(name):
+            cursor = SEARCH_COLLECTIONS[name].find(
+                {"$text": {"$search": query}},
+                {"_id": 0, "score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(limit)
+            docs = await cursor.to_list(length=limit)
+            return [
+                {
+                    "type": name,
+                    "id": doc["id"],
+                    "title": _result_title(name, doc),
+                    "summary": _result_summary(name, doc),
+                    "score": round(doc["score"], 4),
+                }
+                for doc in docs
+            ]
+
+        batches = await asyncio.gather(*(search_collection(name) for name in doc_types))
+        results = [result for batch in batches for result in batch]
+        results.sort(key=lambda result: -result["score"])
+        return results[:limit]
+
+
+portfolio_search = PortfolioSearch()
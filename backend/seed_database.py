@@ -1,4 +1,7 @@
+import argparse
 import asyncio
+import hashlib
+import json
 import sys
 import os
 from pathlib import Path
@@ -7,8 +10,18 @@ from pathlib import Path
 backend_path = Path(__file__).parent.parent
 sys.path.append(str(backend_path))
 
-from database import init_database, projects, experiences, technical_expertise
+from database import (
+    init_database,
+    refresh_portfolio_stats,
+    projects,
+    experiences,
+    technical_expertise,
+)
+from pymongo import DeleteMany, UpdateOne
+from indexes import index_spec
 from models import Project, Experience, TechnicalExpertise
+from snapshot_store import SNAPSHOT_FILE, publish_snapshot, read_version
+from routes.portfolio import snapshot_payloads
 
 # Portfolio data based on your background
 PROJECTS_DATA = [
@@ -204,50 +217,152 @@ TECHNICAL_EXPERTISE_DATA = [
     }
 ]
 
-async def seed_database():
-    """Seed the database with portfolio data"""
+# Fields the seeder owns but that are not part of the seeded content
+VOLATILE_FIELDS = ("created_at", "seed_hash")
+
+def content_hash(doc):
+    """Hash a seeded document's content, ignoring timestamps set at insert time"""
+    content = {key: value for key, value in doc.items() if key not in VOLATILE_FIELDS}
+    raw = json.dumps(content, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+def build_documents():
+    """Validate the seed data and return the documents for each collection"""
+    seeds = [
+        (projects, Project, PROJECTS_DATA),
+        (experiences, Experience, EXPERIENCE_DATA),
+        (technical_expertise, TechnicalExpertise, TECHNICAL_EXPERTISE_DATA),
+    ]
+    documents = []
+    for collection, model, data in seeds:
+        docs = []
+        for item in data:
+            doc = model(**item).dict()
+            doc["seed_hash"] = content_hash(doc)
+            docs.append(doc)
+        documents.append((collection, docs))
+    return documents
+
+async def diff_collection(collection, docs):
+    """Compare seed documents with what is stored, by id and content hash"""
+    stored = {}
+    cursor = collection.find({}, {"_id": 0, "id": 1, "seed_hash": 1})
+    async for existing in cursor:
+        stored[existing.get("id")] = existing.get("seed_hash")
+    
+    diff = {"insert": [], "update": [], "delete": [], "unchanged": []}
+    for doc in docs:
+        if doc["id"] not in stored:
+            diff["insert"].append(doc["id"])
+        elif stored[doc["id"]] != doc["seed_hash"]:
+            # Documents written before hashes were stored count as changed once
+            diff["update"].append(doc["id"])
+        else:
+            diff["unchanged"].append(doc["id"])
+    
+    seeded_ids = {doc["id"] for doc in docs}
+    diff["delete"] = sorted(str(doc_id) for doc_id in stored if doc_id not in seeded_ids)
+    return diff
+
+async def apply_incremental(collection, docs, diff):
+    """Upsert changed documents and delete stale ones in one unordered bulk write"""
+    changed = set(diff["insert"]) | set(diff["update"])
+    operations = []
+    for doc in docs:
+        if doc["id"] not in changed:
+            continue
+        # Keep the original created_at so project ordering stays stable
+        update = {"$set": {key: value for key, value in doc.items() if key != "created_at"}}
+        if "created_at" in doc:
+            update["$setOnInsert"] = {"created_at": doc["created_at"]}
+        operations.append(UpdateOne({"id": doc["id"]}, update, upsert=True))
+    if diff["delete"]:
+        operations.append(DeleteMany({"id": {"$in": diff["delete"]}}))
+    
+    if operations:
+        await collection.bulk_write(operations, ordered=False)
+
+async def apply_swap(collection, docs):
+    """Load docs into a staging collection, then rename it over the live one"""
+    staging = collection.database[f"{collection.name}_staging"]
+    await staging.drop()
+    
+    # Reuse stored created_at values so project ordering survives the swap
+    created = {}
+    async for existing in collection.find({}, {"_id": 0, "id": 1, "created_at": 1}):
+        if "created_at" in existing:
+            created[existing["id"]] = existing["created_at"]
+    docs = [
+        {**doc, "created_at": created[doc["id"]]} if "created_at" in doc and doc["id"] in created else doc
+        for doc in docs
+    ]
+    if docs:
+        await staging.insert_many(docs)
+    
+    # Build the declared indexes so the renamed collection is ready to serve
+    indexes = index_spec().get(collection.name, [])
+    if indexes:
+        await staging.create_indexes(indexes)
+    
+    await staging.rename(collection.name, dropTarget=True)
+
+def print_diff(collection, diff):
+    print(
+        f"  {collection.name}: {len(diff['insert'])} to insert, {len(diff['update'])} to update, "
+        f"{len(diff['delete'])} to delete, {len(diff['unchanged'])} unchanged"
+    )
+    for action in ("insert", "update", "delete"):
+        for doc_id in diff[action]:
+            print(f"    {action}: {doc_id}")
+
+async def seed_database(mode="incremental", dry_run=False):
+    """Seed the database with portfolio data, writing only what changed"""
     try:
-        print("Initializing database...")
-        await init_database()
+        if not dry_run:
+            # Index creation is a write too, so dry runs leave it out
+            print("Initializing database...")
+            await init_database()
         
-        # Clear existing data
-        print("Clearing existing data...")
-        await projects.delete_many({})
-        await experiences.delete_many({})
-        await technical_expertise.delete_many({})
+        documents = build_documents()
         
-        # Insert projects
-        print("Inserting projects...")
-        project_docs = []
-        for project_data in PROJECTS_DATA:
-            project = Project(**project_data)
-            project_docs.append(project.dict())
+        print("Comparing seed data with stored documents...")
+        report = {}
+        for collection, docs in documents:
+            report[collection.name] = await diff_collection(collection, docs)
+            print_diff(collection, report[collection.name])
         
-        if project_docs:
-            await projects.insert_many(project_docs)
-            print(f"Inserted {len(project_docs)} projects")
+        changed = any(
+            diff["insert"] or diff["update"] or diff["delete"]
+            for diff in report.values()
+        )
         
-        # Insert experiences
-        print("Inserting experiences...")
-        experience_docs = []
-        for exp_data in EXPERIENCE_DATA:
-            experience = Experience(**exp_data)
-            experience_docs.append(experience.dict())
+        if dry_run:
+            print("Dry run, no changes written")
+            return report
         
-        if experience_docs:
-            await experiences.insert_many(experience_docs)
-            print(f"Inserted {len(experience_docs)} experiences")
+        if mode == "swap":
+            # Readers see either the old or the new collection, never a partial one
+            print("Swapping in staging collections...")
+            for collection, docs in documents:
+                await apply_swap(collection, docs)
+                print(f"Swapped {len(docs)} documents into {collection.name}")
+        elif changed:
+            print("Applying changes...")
+            for collection, docs in documents:
+                await apply_incremental(collection, docs, report[collection.name])
+        else:
+            print("Portfolio data already up to date")
         
-        # Insert technical expertise
-        print("Inserting technical expertise...")
-        expertise_docs = []
-        for expertise_data in TECHNICAL_EXPERTISE_DATA:
-            expertise = TechnicalExpertise(**expertise_data)
-            expertise_docs.append(expertise.dict())
+        if changed or mode == "swap":
+            # Materialize the stats document served by /api/portfolio/stats;
+            # its new updated_at tells running workers to drop their caches
+            stats = await refresh_portfolio_stats()
+            print(f"Stored portfolio stats: {stats}")
         
-        if expertise_docs:
-            await technical_expertise.insert_many(expertise_docs)
-            print(f"Inserted {len(expertise_docs)} technical expertise entries")
+        if SNAPSHOT_FILE and (changed or mode == "swap" or not read_version(SNAPSHOT_FILE)):
+            # Workers pick up the new version on their next check
+            version = publish_snapshot(await snapshot_payloads(), SNAPSHOT_FILE)
+            print(f"Published portfolio snapshot version {version} to {SNAPSHOT_FILE}")
         
         print("Database seeding completed successfully!")
         
@@ -257,10 +372,27 @@ async def seed_database():
         expertise_count = await technical_expertise.count_documents({})
         
         print(f"Verification - Projects: {project_count}, Experiences: {experience_count}, Expertise: {expertise_count}")
+        return report
         
     except Exception as e:
         print(f"Error seeding database: {e}")
         raise
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the portfolio collections")
+    parser.add_argument(
+        "--mode",
+        choices=["incremental", "swap"],
+        default="incremental",
+        help="upsert/delete only changed documents, or rebuild in staging collections and rename them into place"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the changes that would be made without writing anything"
+    )
+    return parser.parse_args()
+
 if __name__ == "__main__":
-    asyncio.run(seed_database())
\ No newline at end of file
+    args = parse_args()
+    asyncio.run(seed_database(mode=args.mode, dry_run=args.dry_run))
@@ -1,10 +1,17 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
 import logging
 from pathlib import Path
-from database import init_database, close_database
+from database import init_database, close_database, warm_up_pool
+from contact_writer import contact_writer, BATCHING_ENABLED
+from contact_outbox import contact_outbox
+from search_index import portfolio_search
+from metrics import registry, MetricsMiddleware
+from compression import CompressionMiddleware
+from server_timing import ServerTimingMiddleware
+from json_encoding import FastJSONResponse
 from routes.contact import router as contact_router
 from routes.portfolio import router as portfolio_router
 
@@ -15,7 +22,8 @@ load_dotenv(ROOT_DIR / '.env')
 app = FastAPI(
     title="Halil Sekeroglu Portfolio API",
     description="Backend API for portfolio website",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Create a router with the /api prefix
@@ -37,6 +45,14 @@ async def health_check():
         "service": "portfolio-api"
     }
 
+@api_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return Response(
+        content=registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 # Include route modules
 api_router.include_router(contact_router)
 api_router.include_router(portfolio_router)
@@ -52,6 +68,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Negotiates gzip/brotli for anything not served precompressed
+app.add_middleware(CompressionMiddleware)
+
+# Opt-in Server-Timing header; wraps compression so that time is reported too
+app.add_middleware(ServerTimingMiddleware)
+
+# Outermost middleware, so recorded latency covers the whole stack
+app.add_middleware(MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -61,8 +86,21 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_db():
+    await warm_up_pool()
     await init_database()
+    try:
+        await portfolio_search.refresh()
+    except Exception as e:
+        # Search builds lazily on first use if Mongo is not ready yet
+        logger.error(f"Error building search index: {e}")
+    if BATCHING_ENABLED:
+        await contact_writer.start()
+    await contact_outbox.start()
 
 @app.on_event("shutdown")
 async def shutdown_db():
+    # Flush buffered contact messages before the client goes away
+    await contact_writer.drain()
+    # Entries not delivered by now stay pending in contact_outbox for the next start
+    await contact_outbox.drain()
     await close_database()
@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Opt-in: per-phase timings as a Server-Timing header plus one log line per request
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING', 'false').lower() == 'true'
+
+_current = ContextVar("server_timing", default=None)
+
+
+class RequestTimings:
+    """Phase durations and annotations collected while serving one request"""
+
+    def __init__(self):
+        self.phases = {}
+        self.notes = {}
+
+    def add(self, name, duration_ms):
+        # Phases that run more than once (or concurrently, as in the bundle)
+        # are summed, so they can add up to more than the wall time
+        self.phases[name] = self.phases.get(name, 0.0) + duration_ms
+
+    def header(self, total_ms):
+        entries = [f"{name};dur={duration:.2f}" for name, duration in self.phases.items()]
+        entries.extend(f'{name};desc="{note}"' for name, note in self.notes.items())
+        entries.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(entries)
+
+
+@contextmanager
+def phase(name):
+    """Time the enclosed block as one phase of the current request"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - started) * 1000)
+
+
+def annotate(name, description):
+    """Attach a short description, such as a cache outcome, to the current request
+
+    The first description for a name wins, so an outer lookup (the bundle) is
+    not overwritten by the lookups it makes for its parts.
+    """
+    timings = _current.get()
+    if timings is not None:
+        timings.notes.setdefault(name, description)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware emitting the phases recorded by handlers as Server-Timing
+
+    Time spent in FastAPI's own response_model pass is not a separate phase;
+    it shows up as the gap between the phases and total.
+    """
+
+    def __init__(self, app, enabled=SERVER_TIMING_ENABLED):
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                total_ms = (time.perf_counter() - started) * 1000
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", timings.header(total_ms).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            # Logged after the body is sent, so streamed responses are covered too
+            total_ms = (time.perf_counter() - started) * 1000
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            fields = {name: round(duration, 3) for name, duration in timings.phases.items()}
+            fields["total"] = round(total_ms, 3)
+            summary = " ".join(f"{name}={duration:.2f}ms" for name, duration in fields.items())
+            logger.info(
+                f"Server timing {scope['method']} {route} {status_code}: {summary}",
+                extra={
+                    "http_method": scope["method"],
+                    "http_route": route,
+                    "http_status": status_code,
+                    "server_timing": fields,
+                    "server_timing_notes": dict(timings.notes),
+                },
+            )
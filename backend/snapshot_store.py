@@ -0,0 +1,193 @@
+from datetime import datetime, timezone
+from cache import invalidate_portfolio_cache
+from compression import COMPRESSION_MIN_SIZE, supported_encodings
+from http_cache import CachedPayload
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Versioned file of pre-encoded portfolio responses shared by every worker on
+# the host; unset to have each worker load from MongoDB on its own
+SNAPSHOT_FILE = os.environ.get('PORTFOLIO_SNAPSHOT_FILE', '')
+# How often a worker checks whether a newer snapshot has been published
+SNAPSHOT_CHECK_SECONDS = float(os.environ.get('PORTFOLIO_SNAPSHOT_CHECK_SECONDS', '1'))
+
+MAGIC = b"PFSNAP01"
+# magic, version, header length; the JSON header and the bodies follow
+PREFIX = struct.Struct("<8sQI")
+
+
+def read_version(path):
+    """Version of the snapshot at path, or 0 when there is none"""
+    try:
+        with open(path, "rb") as snapshot:
+            magic, version, _ = PREFIX.unpack(snapshot.read(PREFIX.size))
+    except (FileNotFoundError, struct.error):
+        return 0
+    return version if magic == MAGIC else 0
+
+
+def publish_snapshot(payloads, path=SNAPSHOT_FILE):
+    """Write payloads as the next snapshot version and atomically swap it in
+
+    Each payload is stored with its precompressed variants, so serving workers
+    never encode or compress these responses themselves.
+    """
+    version = read_version(path) + 1
+    sections = {}
+    bodies = []
+    offset = 0
+    for key, payload in payloads.items():
+        codings = {"identity": payload.body}
+        if len(payload.body) >= COMPRESSION_MIN_SIZE:
+            for encoding in supported_encodings():
+                codings[encoding] = payload.body_for(encoding, precompress=True)
+
+        section = {"etag": payload.etag, "bodies": {}}
+        if payload.last_modified is not None:
+            section["last_modified"] = payload.last_modified.isoformat()
+        for coding, body in codings.items():
+            section["bodies"][coding] = [offset, len(body)]
+            bodies.append(body)
+            offset += len(body)
+        sections[key] = section
+
+    header = json.dumps({
+        "version": version,
+        "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+        "sections": sections,
+    }, separators=(",", ":")).encode("utf-8")
+
+    # Write beside the target and rename over it, so readers only ever open
+    # a complete file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as snapshot:
+        snapshot.write(PREFIX.pack(MAGIC, version, len(header)))
+        snapshot.write(header)
+        for body in bodies:
+            snapshot.write(body)
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+    os.replace(temp_path, path)
+    return version
+
+
+class SnapshotPayload(CachedPayload):
+    """CachedPayload whose bodies are views into the shared snapshot mapping"""
+
+    prebuilt = True
+
+    def __init__(self, views, etag, last_modified):
+        self._views = views
+        self.body = views["identity"]
+        self.etag = etag
+        self.last_modified = last_modified
+        self._compressed = {}
+        self._data = None
+
+    @property
+    def data(self):
+        # Only needed when the bundle combines a snapshot part with live data
+        if self._data is None:
+            self._data = json.loads(bytes(self.body))
+        return self._data
+
+    def body_for(self, encoding, precompress=False):
+        view = self._views.get(encoding or "identity")
+        if view is not None:
+            # Copied only into the outgoing response; the page cache keeps the
+            # single shared copy
+            return bytes(view)
+        return super().body_for(encoding, precompress)
+
+
+class _SnapshotVersion:
+    def __init__(self, mapping):
+        magic, version, header_length = PREFIX.unpack_from(mapping, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a portfolio snapshot file")
+        data_start = PREFIX.size + header_length
+        header = json.loads(mapping[PREFIX.size:data_start])
+
+        self.version = version
+        self.mapping = mapping
+        view = memoryview(mapping)
+        created_at = datetime.fromisoformat(header["created_at"])
+        self.payloads = {}
+        for key, section in header["sections"].items():
+            views = {
+                coding: view[data_start + start:data_start + start + length]
+                for coding, (start, length) in section["bodies"].items()
+            }
+            # Same data version as the per-process cache; files written before
+            # sections carried it fall back to the publish time
+            last_modified = section.get("last_modified")
+            last_modified = datetime.fromisoformat(last_modified) if last_modified else created_at
+            self.payloads[key] = SnapshotPayload(views, section["etag"], last_modified)
+
+
+class SharedSnapshot:
+    """Memory-maps the published snapshot and follows newer versions"""
+
+    def __init__(self, path=SNAPSHOT_FILE, check_interval=SNAPSHOT_CHECK_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._current = None
+        self._file_id = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        current = self._current
+        return current.version if current else 0
+
+    def get(self, key):
+        """Return the snapshot payload for a cache key, or None"""
+        if not self.path:
+            return None
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.reload()
+        current = self._current
+        return current.payloads.get(key) if current else None
+
+    def reload(self):
+        """Map the snapshot file if a different one has been published"""
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return False
+            file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_id == self._file_id:
+                return False
+
+            try:
+                with open(self.path, "rb") as snapshot:
+                    mapping = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+                loaded = _SnapshotVersion(mapping)
+            except (OSError, ValueError) as e:
+                logger.error(f"Error loading portfolio snapshot {self.path}: {e}")
+                self._file_id = file_id
+                return False
+
+            previous = self.version
+            # Requests holding the old version keep its mapping alive until
+            # they finish; the swap itself is a single reference assignment
+            self._current = loaded
+            self._file_id = file_id
+
+        # Responses cached from older data would outlive the swap otherwise
+        invalidate_portfolio_cache()
+        logger.info(f"Portfolio snapshot version {loaded.version} loaded (was {previous})")
+        return True
+
+
+portfolio_snapshot = SharedSnapshot()
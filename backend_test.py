@@ -102,6 +102,18 @@ class APITester:
         except Exception as e:
             self.log_test("GET /api/health - Health Check", False, f"Request failed: {str(e)}")
 
+        # Test GET /api/metrics
+        try:
+            response = requests.get(f"{API_BASE_URL}/metrics", timeout=10)
+            if response.status_code == 200 and "http_request_duration_seconds" in response.text:
+                self.log_test("GET /api/metrics - Prometheus Metrics", True, 
+                            f"Content-Type: {response.headers.get('Content-Type')}")
+            else:
+                self.log_test("GET /api/metrics - Prometheus Metrics", False, 
+                            f"Status: {response.status_code}", response.text[:500])
+        except Exception as e:
+            self.log_test("GET /api/metrics - Prometheus Metrics", False, f"Request failed: {str(e)}")
+
     def test_contact_form_functionality(self):
         """Test contact form functionality"""
         print("=== TESTING CONTACT FORM FUNCTIONALITY ===")
@@ -305,6 +317,150 @@ class APITester:
         except Exception as e:
             self.log_test("GET /api/portfolio/stats - Portfolio Statistics", False, f"Request failed: {str(e)}")
 
+    def test_contact_inbox_and_export(self):
+        """Test keyset pagination and streaming export of contact messages"""
+        print("=== TESTING CONTACT INBOX AND EXPORT ===")
+        
+        # Test GET /api/contact/inbox pages without gaps or repeats
+        try:
+            seen = []
+            cursor = None
+            pages = 0
+            while pages < 50:
+                params = {"limit": 2}
+                if cursor:
+                    params["cursor"] = cursor
+                response = requests.get(f"{API_BASE_URL}/contact/inbox", params=params, timeout=10)
+                if response.status_code != 200:
+                    break
+                data = response.json()
+                seen.extend(message["id"] for message in data["messages"])
+                pages += 1
+                cursor = data.get("next_cursor")
+                if not cursor:
+                    break
+            
+            if response.status_code == 200 and not cursor and len(seen) == len(set(seen)):
+                self.log_test("GET /api/contact/inbox - Keyset Pagination", True, 
+                            f"Read {len(seen)} messages in {pages} pages without repeats")
+            else:
+                self.log_test("GET /api/contact/inbox - Keyset Pagination", False, 
+                            f"Status: {response.status_code}, pages: {pages}, repeated ids: {len(seen) - len(set(seen))}",
+                            response.text)
+        except Exception as e:
+            self.log_test("GET /api/contact/inbox - Keyset Pagination", False, f"Request failed: {str(e)}")
+
+        # Test malformed cursor returns 400
+        try:
+            response = requests.get(f"{API_BASE_URL}/contact/inbox", 
+                                  params={"cursor": "not-a-cursor"}, 
+                                  timeout=10)
+            if response.status_code == 400:
+                self.log_test("GET /api/contact/inbox - Invalid Cursor", True, 
+                            "Correctly rejected malformed cursor")
+            else:
+                self.log_test("GET /api/contact/inbox - Invalid Cursor", False, 
+                            f"Expected 400, got {response.status_code}", response.text)
+        except Exception as e:
+            self.log_test("GET /api/contact/inbox - Invalid Cursor", False, f"Request failed: {str(e)}")
+
+        # Test GET /api/contact/export in both formats
+        for export_format in ("ndjson", "csv"):
+            test_name = f"GET /api/contact/export - {export_format.upper()} Export"
+            try:
+                response = requests.get(f"{API_BASE_URL}/contact/export", 
+                                      params={"format": export_format}, 
+                                      timeout=30)
+                if response.status_code == 200:
+                    lines = [line for line in response.text.splitlines() if line]
+                    if export_format == "ndjson":
+                        rows = [json.loads(line) for line in lines]
+                        valid = all("id" in row and "timestamp" in row for row in rows)
+                    else:
+                        rows = lines[1:]
+                        valid = bool(lines) and lines[0].startswith("id,")
+                    if valid:
+                        self.log_test(test_name, True, f"Exported {len(rows)} messages")
+                    else:
+                        self.log_test(test_name, False, "Unexpected export rows", response.text[:500])
+                else:
+                    self.log_test(test_name, False, 
+                                f"Status: {response.status_code}", response.text)
+            except Exception as e:
+                self.log_test(test_name, False, f"Request failed: {str(e)}")
+
+        # Test unknown export format returns 400
+        try:
+            response = requests.get(f"{API_BASE_URL}/contact/export", 
+                                  params={"format": "xml"}, 
+                                  timeout=10)
+            if response.status_code == 400:
+                self.log_test("GET /api/contact/export - Invalid Format", True, 
+                            "Correctly rejected unknown export format")
+            else:
+                self.log_test("GET /api/contact/export - Invalid Format", False, 
+                            f"Expected 400, got {response.status_code}", response.text)
+        except Exception as e:
+            self.log_test("GET /api/contact/export - Invalid Format", False, f"Request failed: {str(e)}")
+
+    def test_portfolio_bundle_and_search(self):
+        """Test the combined portfolio bundle and full-text search"""
+        print("=== TESTING PORTFOLIO BUNDLE AND SEARCH ===")
+        
+        # Test GET /api/portfolio/bundle
+        try:
+            response = requests.get(f"{API_BASE_URL}/portfolio/bundle", timeout=10)
+            if response.status_code == 200:
+                data = response.json()
+                required_parts = ["projects", "experience", "expertise", "stats"]
+                missing_parts = [part for part in required_parts if part not in data]
+                if not missing_parts:
+                    self.log_test("GET /api/portfolio/bundle - Portfolio Bundle", True, 
+                                f"Bundle has {len(data['projects'])} projects, {len(data['experience'])} experiences, "
+                                f"{len(data['expertise'])} expertise areas")
+                else:
+                    self.log_test("GET /api/portfolio/bundle - Portfolio Bundle", False, 
+                                f"Missing parts: {missing_parts}", data)
+            else:
+                self.log_test("GET /api/portfolio/bundle - Portfolio Bundle", False, 
+                            f"Status: {response.status_code}", response.text)
+        except Exception as e:
+            self.log_test("GET /api/portfolio/bundle - Portfolio Bundle", False, f"Request failed: {str(e)}")
+
+        # Test GET /api/portfolio/search finds seeded data
+        try:
+            response = requests.get(f"{API_BASE_URL}/portfolio/search", 
+                                  params={"q": "dialogflow"}, 
+                                  timeout=10)
+            if response.status_code == 200:
+                data = response.json()
+                results = data.get("results", [])
+                if results and all({"type", "id", "title", "score"} <= set(result) for result in results):
+                    self.log_test("GET /api/portfolio/search - Full-Text Search", True, 
+                                f"Found {data['total']} results using the {data.get('engine')} engine")
+                else:
+                    self.log_test("GET /api/portfolio/search - Full-Text Search", False, 
+                                "No results or missing result fields", data)
+            else:
+                self.log_test("GET /api/portfolio/search - Full-Text Search", False, 
+                            f"Status: {response.status_code}", response.text)
+        except Exception as e:
+            self.log_test("GET /api/portfolio/search - Full-Text Search", False, f"Request failed: {str(e)}")
+
+        # Test unknown search type returns 400
+        try:
+            response = requests.get(f"{API_BASE_URL}/portfolio/search", 
+                                  params={"q": "dialogflow", "type": "invalid"}, 
+                                  timeout=10)
+            if response.status_code == 400:
+                self.log_test("GET /api/portfolio/search - Invalid Type", True, 
+                            "Correctly rejected unknown search type")
+            else:
+                self.log_test("GET /api/portfolio/search - Invalid Type", False, 
+                            f"Expected 400, got {response.status_code}", response.text)
+        except Exception as e:
+            self.log_test("GET /api/portfolio/search - Invalid Type", False, f"Request failed: {str(e)}")
+
     def test_data_validation(self):
         """Test data validation and seeded data"""
         print("=== TESTING DATA VALIDATION ===")
@@ -467,7 +623,9 @@ class APITester:
         
         self.test_health_endpoints()
         self.test_contact_form_functionality()
+        self.test_contact_inbox_and_export()
         self.test_portfolio_data_endpoints()
+        self.test_portfolio_bundle_and_search()
         self.test_data_validation()
         self.test_error_handling()
         
@@ -9,7 +9,7 @@ import TechnicalExpertise from "./TechnicalExpertise";
 import Contact from "./Contact";
 import Footer from "./Footer";
 import { enhancedMockData } from "../data/enhanced-mock";
-import { apiService, checkBackendAvailability } from "../services/api";
+import { apiService } from "../services/api";
 
 const Portfolio = () => {
   const [portfolioData, setPortfolioData] = useState(null);
@@ -22,34 +22,24 @@ const Portfolio = () => {
       try {
         setLoading(true);
         
-        // Check if backend is available
-        const backendAvailable = await checkBackendAvailability();
-        setIsBackendAvailable(backendAvailable);
+        // One request for all sections; a failed bundle doubles as the
+        // backend availability check
+        const bundle = await apiService.getPortfolioBundle();
+        setIsBackendAvailable(bundle !== null);
         
-        if (backendAvailable) {
-          // Try to load data from backend
-          try {
-            const [projects, experience, expertise, stats] = await Promise.all([
-              apiService.getProjects(),
-              apiService.getExperience(),
-              apiService.getTechnicalExpertise(),
-              apiService.getPortfolioStats()
-            ]);
-            
-            // If backend data is available, use it; otherwise fall back to mock
-            const backendData = {
-              ...enhancedMockData,
-              projects: projects.length > 0 ? projects : enhancedMockData.projects,
-              experience: experience.length > 0 ? experience : enhancedMockData.experience,
-              technicalExpertise: expertise.length > 0 ? expertise : enhancedMockData.technicalExpertise,
-              stats: { ...enhancedMockData.stats, ...stats }
-            };
-            
-            setPortfolioData(backendData);
-          } catch (apiError) {
-            console.warn('API error, falling back to mock data:', apiError);
-            setPortfolioData(enhancedMockData);
-          }
+        if (bundle) {
+          const { projects, experience, expertise, stats } = bundle;
+          
+          // If backend data is available, use it; otherwise fall back to mock
+          const backendData = {
+            ...enhancedMockData,
+            projects: projects.length > 0 ? projects : enhancedMockData.projects,
+            experience: experience.length > 0 ? experience : enhancedMockData.experience,
+            technicalExpertise: expertise.length > 0 ? expertise : enhancedMockData.technicalExpertise,
+            stats: { ...enhancedMockData.stats, ...stats }
+          };
+          
+          setPortfolioData(backendData);
         } else {
           // Use mock data if backend is not available
           setPortfolioData(enhancedMockData);
@@ -56,6 +56,8 @@ export const apiService = {
     } catch (error) {
       if (error.response?.status === 422) {
         throw new Error('Please check your form data and try again');
+      } else if (error.response?.status === 429) {
+        throw new Error('Too many messages sent. Please try again later');
       } else if (error.response?.status === 500) {
         throw new Error('Server error. Please try again later');
       }
@@ -115,6 +117,17 @@ export const apiService = {
     }
   },
 
+  // Projects, experience, expertise and stats in a single request
+  async getPortfolioBundle() {
+    try {
+      const response = await apiClient.get('/portfolio/bundle');
+      return response.data;
+    } catch (error) {
+      console.warn('Failed to fetch portfolio bundle from API, using mock data');
+      return null;
+    }
+  },
+
   async getPortfolioStats() {
     try {
       const response = await apiClient.get('/portfolio/stats');
@@ -0,0 +1,45 @@
+"""
+Shared setup for tests that exercise the API: the backend's Motor client is
+replaced with mongomock-motor before any backend module connects.
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import motor.motor_asyncio
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.append(str(backend_path))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+
+# database.py builds its client at import time
+motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Return a client factory for the app, starting from an empty database and cold caches"""
+    import cache
+    import database
+    from search_index import portfolio_search
+    from server import app
+
+    asyncio.run(database.client.drop_database(database.db.name))
+    # The unique indexes behind duplicate suppression
+    asyncio.run(database.init_database())
+    cache.invalidate_portfolio_cache()
+    portfolio_search.invalidate()
+    # Every request re-reads the data version, as if the interval had passed
+    monkeypatch.setattr(cache.portfolio_version, "check_interval", 0)
+    monkeypatch.setattr(cache.portfolio_version, "_version", cache._UNSET)
+
+    def client():
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver")
+
+    return client
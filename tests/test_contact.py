@@ -0,0 +1,212 @@
+"""
+Contact form endpoints against mongomock-motor.
+
+Run from the repository root: python -m pytest tests
+"""
+
+import asyncio
+import base64
+from datetime import datetime, timedelta
+
+import pytest
+
+import database
+from contact_writer import contact_writer
+from models import ContactMessage
+from routes import contact as contact_routes
+
+MESSAGE = {
+    "name": "Ann Example",
+    "email": "ann@example.com",
+    "subject": "Project inquiry",
+    "message": "Interested in a Dialogflow CX engagement",
+}
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    """Run the batching writer in the given ack mode for the duration of a test"""
+
+    def configure(ack_mode, interval=0.01):
+        monkeypatch.setattr(contact_writer, "ack_mode", ack_mode)
+        monkeypatch.setattr(contact_writer, "interval", interval)
+        return contact_writer
+
+    return configure
+
+
+async def post_twice(client, first=MESSAGE, second=MESSAGE, headers=None):
+    original = await client.post("/api/contact/", json=first, headers=headers)
+    retried = await client.post("/api/contact/", json=second, headers=headers)
+    assert original.status_code == 200
+    assert retried.status_code == 200
+    return original, retried
+
+
+def assert_replayed(original, retried):
+    assert "Idempotent-Replayed" not in original.headers
+    assert retried.headers["Idempotent-Replayed"] == "true"
+    assert retried.json()["id"] == original.json()["id"]
+
+
+def test_identical_submission_replays_original(api):
+    async def run():
+        async with api() as client:
+            responses = await post_twice(client)
+        return responses, await database.contact_messages.count_documents({})
+
+    (original, retried), stored = asyncio.run(run())
+
+    assert_replayed(original, retried)
+    assert stored == 1
+
+
+def test_reused_idempotency_key_replays_original(api):
+    async def run():
+        async with api() as client:
+            changed = {**MESSAGE, "message": "Changed my mind about the wording"}
+            responses = await post_twice(client, second=changed, headers={"Idempotency-Key": "retry-1"})
+        return responses, await database.contact_messages.count_documents({})
+
+    (original, retried), stored = asyncio.run(run())
+
+    assert_replayed(original, retried)
+    assert retried.json()["message"] == MESSAGE["message"]
+    assert stored == 1
+
+
+def test_duplicate_across_window_boundary_replays_original(api, monkeypatch):
+    now = datetime.utcnow()
+    earlier = now - timedelta(seconds=1)
+    # A window as long as the epoch time puts a boundary between the two copies
+    window = int(now.timestamp())
+    monkeypatch.setattr(contact_routes, "DUPLICATE_WINDOW_SECONDS", window)
+    stored = ContactMessage(**MESSAGE, timestamp=earlier)
+    stored.content_hash = contact_routes._content_hash(stored)
+    assert stored.content_hash != contact_routes._content_hash(ContactMessage(**MESSAGE, timestamp=now))
+
+    async def run():
+        await database.contact_messages.insert_one(stored.dict(exclude_none=True))
+        async with api() as client:
+            response = await client.post("/api/contact/", json=MESSAGE)
+        return response, await database.contact_messages.count_documents({})
+
+    response, count = asyncio.run(run())
+
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert response.json()["id"] == stored.id
+    assert count == 1
+
+
+def test_duplicate_replays_original_in_flush_mode(api, writer):
+    batching = writer("flush")
+
+    async def run():
+        await batching.start()
+        try:
+            async with api() as client:
+                return await post_twice(client)
+        finally:
+            await batching.drain()
+
+    original, retried = asyncio.run(run())
+
+    assert_replayed(original, retried)
+    assert asyncio.run(database.contact_messages.count_documents({})) == 1
+
+
+def test_duplicate_of_buffered_message_replays_original_in_enqueue_mode(api, writer):
+    # Long enough that the first copy is still buffered when the second arrives
+    batching = writer("enqueue", interval=5)
+
+    async def run():
+        await batching.start()
+        try:
+            async with api() as client:
+                responses = await post_twice(client)
+            buffered = await database.contact_messages.count_documents({})
+        finally:
+            await batching.drain()
+        return responses, buffered, await database.contact_messages.count_documents({})
+
+    (original, retried), buffered, stored = asyncio.run(run())
+
+    assert_replayed(original, retried)
+    assert buffered == 0
+    assert stored == 1
+
+
+def inbox_messages(count, timestamps):
+    """Stored messages cycling through the given timestamps, so several share one"""
+    return [
+        ContactMessage(
+            **{**MESSAGE, "subject": f"Project inquiry {index}"},
+            id=f"message-{index:02d}",
+            timestamp=timestamps[index % len(timestamps)],
+        ).dict(exclude_none=True)
+        for index in range(count)
+    ]
+
+
+async def read_inbox(client, limit):
+    pages = []
+    cursor = None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/api/contact/inbox", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        pages.append([message["id"] for message in page["messages"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_inbox_pages_through_equal_timestamps_without_gaps_or_repeats(api):
+    base = datetime(2024, 5, 1, 12, 0, 0)
+    # Seven messages per timestamp, so every page boundary falls inside a tie
+    timestamps = [base, base - timedelta(minutes=1), base - timedelta(minutes=2)]
+    documents = inbox_messages(21, timestamps)
+    expected = [
+        document["id"]
+        for document in sorted(documents, key=lambda doc: (doc["timestamp"], doc["id"]), reverse=True)
+    ]
+
+    async def run():
+        await database.contact_messages.insert_many(documents)
+        async with api() as client:
+            return await read_inbox(client, limit=4)
+
+    pages = asyncio.run(run())
+
+    assert [len(page) for page in pages] == [4, 4, 4, 4, 4, 1]
+    assert [message_id for page in pages for message_id in page] == expected
+
+
+def test_inbox_last_full_page_has_no_next_cursor(api):
+    documents = inbox_messages(4, [datetime(2024, 5, 1)])
+
+    async def run():
+        await database.contact_messages.insert_many(documents)
+        async with api() as client:
+            return await read_inbox(client, limit=2)
+
+    assert asyncio.run(run()) == [["message-03", "message-02"], ["message-01", "message-00"]]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"not json").decode("ascii"),
+    base64.urlsafe_b64encode(b'{"id": "message-01"}').decode("ascii"),
+    base64.urlsafe_b64encode(b'{"t": "yesterday", "id": "message-01"}').decode("ascii"),
+    base64.urlsafe_b64encode(b'["2024-05-01T00:00:00", "message-01"]').decode("ascii"),
+])
+def test_inbox_rejects_malformed_cursor(api, cursor):
+    async def run():
+        async with api() as client:
+            return await client.get("/api/contact/inbox", params={"cursor": cursor})
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,320 @@
+"""
+Contact outbox delivery against local SMTP and HTTP stand-ins, with
+mongomock-motor in place of MongoDB.
+
+Run from the repository root: python -m pytest tests
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+# Add backend to path
+backend_path = Path(__file__).parent.parent / "backend"
+sys.path.append(str(backend_path))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+
+import contact_outbox as outbox_module
+from contact_outbox import ContactOutbox
+from notifications import SMTPNotifier, WebhookNotifier
+
+WEBHOOK_SECRET = "test-secret"
+
+
+class WebhookStandIn:
+    """HTTP server answering each POST with the next status from a script"""
+
+    def __init__(self, statuses=(200,)):
+        self.statuses = list(statuses)
+        self.requests = []
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                stand_in.requests.append((time.monotonic(), body, self.headers))
+                index = min(len(stand_in.requests), len(stand_in.statuses)) - 1
+                self.send_response(stand_in.statuses[index])
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class SMTPStandIn:
+    """Just enough SMTP to accept messages from smtplib and keep them"""
+
+    def __init__(self):
+        self.messages = []
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                self.wfile.write(b"220 stand-in\r\n")
+                lines = None
+                for line in self.rfile:
+                    if lines is not None:
+                        if line == b".\r\n":
+                            stand_in.messages.append(message_from_bytes(b"".join(lines)))
+                            lines = None
+                            self.wfile.write(b"250 queued\r\n")
+                        else:
+                            lines.append(line)
+                        continue
+                    command = line[:4].upper()
+                    if command == b"DATA":
+                        lines = []
+                        self.wfile.write(b"354 end with .\r\n")
+                    elif command == b"QUIT":
+                        self.wfile.write(b"221 bye\r\n")
+                        return
+                    else:
+                        self.wfile.write(b"250 ok\r\n")
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def webhook():
+    servers = []
+
+    def start(statuses=(200,)):
+        server = WebhookStandIn(statuses)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def smtp():
+    server = SMTPStandIn()
+    yield server
+    server.close()
+
+
+def make_outbox(handlers, **options):
+    db = AsyncMongoMockClient()["portfolio_test"]
+    options = {"workers": 2, "retry_base": 0.05, "poll_interval": 0.05, "lease": 5, **options}
+    return ContactOutbox(db.contact_outbox, db.contact_messages, handlers, **options)
+
+
+def webhook_notifier(server):
+    return WebhookNotifier(url=server.url, secret=WEBHOOK_SECRET, timeout=2)
+
+
+def stored_message(message_id="message-1", pending_handlers=("webhook",)):
+    return {
+        "id": message_id,
+        "name": "Ann Example",
+        "email": "ann@example.com",
+        "subject": "Project inquiry",
+        "message": "Interested in a Dialogflow CX engagement",
+        "timestamp": datetime.utcnow(),
+        "status": "unread",
+        "pending_handlers": list(pending_handlers),
+    }
+
+
+async def wait_for(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if await predicate():
+            return True
+        await asyncio.sleep(0.02)
+    return False
+
+
+async def entry_status(outbox, entry_id, status):
+    entry = await outbox.collection.find_one({"_id": entry_id})
+    return entry is not None and entry["status"] == status
+
+
+def test_delivers_email_and_signed_webhook(webhook, smtp):
+    server = webhook()
+    email = SMTPNotifier(
+        host="127.0.0.1", port=smtp.port, sender="site@example.com",
+        recipient="owner@example.com", username="", password="", starttls=False, timeout=2
+    )
+    outbox = make_outbox({"email": email, "webhook": webhook_notifier(server)})
+
+    async def run():
+        await outbox.messages.insert_one(stored_message(pending_handlers=("email", "webhook")))
+        await outbox.start()
+        try:
+            for handler in ("email", "webhook"):
+                assert await wait_for(lambda: entry_status(outbox, f"message-1:{handler}", "delivered"))
+            message = await outbox.messages.find_one({"id": "message-1"})
+            assert "pending_handlers" not in message
+        finally:
+            await outbox.drain(timeout=1)
+
+    asyncio.run(run())
+
+    assert len(smtp.messages) == 1
+    assert smtp.messages[0]["To"] == "owner@example.com"
+    assert smtp.messages[0]["Reply-To"] == "ann@example.com"
+    assert smtp.messages[0]["Subject"] == "New contact message: Project inquiry"
+
+    assert len(server.requests) == 1
+    _, body, headers = server.requests[0]
+    expected = hmac.new(WEBHOOK_SECRET.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    assert headers["X-Signature-SHA256"] == expected
+    assert json.loads(body)["message"]["id"] == "message-1"
+
+
+def test_retries_failed_deliveries_with_exponential_backoff(webhook, monkeypatch):
+    # No jitter, so the delays are exactly retry_base, 2 * retry_base, ...
+    monkeypatch.setattr(outbox_module.random, "uniform", lambda low, high: high)
+    server = webhook(statuses=(500, 503, 200))
+    # The scan interval is longer than the test, so only the backoff timers requeue
+    outbox = make_outbox({"webhook": webhook_notifier(server)}, retry_base=0.2, poll_interval=30)
+
+    async def run():
+        await outbox.messages.insert_one(stored_message())
+        await outbox.start()
+        try:
+            assert await wait_for(lambda: entry_status(outbox, "message-1:webhook", "delivered"))
+            return await outbox.collection.find_one({"_id": "message-1:webhook"})
+        finally:
+            await outbox.drain(timeout=1)
+
+    entry = asyncio.run(run())
+
+    assert entry["attempts"] == 3
+    times = [received for received, _, _ in server.requests]
+    assert len(times) == 3
+    assert times[1] - times[0] >= 0.2
+    assert times[2] - times[1] >= 0.4
+
+
+def test_marks_entry_failed_after_max_attempts(webhook):
+    server = webhook(statuses=(500,))
+    outbox = make_outbox({"webhook": webhook_notifier(server)}, retry_base=0.01, max_attempts=3)
+
+    async def run():
+        await outbox.messages.insert_one(stored_message())
+        await outbox.start()
+        try:
+            assert await wait_for(lambda: entry_status(outbox, "message-1:webhook", "failed"))
+            # Failed entries are dead-lettered, not picked up by later scans
+            await asyncio.sleep(0.3)
+            return await outbox.collection.find_one({"_id": "message-1:webhook"})
+        finally:
+            await outbox.drain(timeout=1)
+
+    entry = asyncio.run(run())
+
+    assert entry["attempts"] == 3
+    assert "500" in entry["last_error"]
+    assert entry["locked_until"] is None
+    assert len(server.requests) == 3
+
+
+def test_reclaims_entry_after_lease_of_crashed_worker_expires(webhook):
+    server = webhook()
+    outbox = make_outbox({"webhook": webhook_notifier(server)})
+    now = datetime.utcnow()
+
+    def claimed_entry(message_id, locked_until):
+        # What a worker leaves behind when the process dies mid-delivery
+        return {
+            "_id": f"{message_id}:webhook",
+            "message_id": message_id,
+            "handler": "webhook",
+            "message": {"id": message_id, "email": "ann@example.com"},
+            "status": "pending",
+            "attempts": 1,
+            "next_attempt_at": now - timedelta(minutes=5),
+            "locked_until": locked_until,
+            "last_error": None,
+            "created_at": now - timedelta(minutes=5),
+        }
+
+    async def run():
+        await outbox.collection.insert_many([
+            claimed_entry("expired", now - timedelta(seconds=1)),
+            claimed_entry("leased", now + timedelta(minutes=5)),
+        ])
+        await outbox.start()
+        try:
+            assert await wait_for(lambda: entry_status(outbox, "expired:webhook", "delivered"))
+            await asyncio.sleep(0.3)
+            return await outbox.collection.find_one({"_id": "leased:webhook"})
+        finally:
+            await outbox.drain(timeout=1)
+
+    leased = asyncio.run(run())
+
+    # The entry whose lease is still running belongs to another worker
+    assert leased["status"] == "pending"
+    assert leased["attempts"] == 1
+    assert [json.loads(body)["message"]["id"] for _, body, _ in server.requests] == ["expired"]
+
+
+def test_creates_missing_entries_after_crash_between_writes(webhook):
+    server = webhook()
+    outbox = make_outbox({"webhook": webhook_notifier(server)})
+
+    async def run():
+        # Entry already created, but the process died before pending_handlers was cleared
+        message = stored_message()
+        await outbox.messages.insert_one(message)
+        await outbox.collection.insert_one({
+            "_id": "message-1:webhook",
+            "message_id": "message-1",
+            "handler": "webhook",
+            "message": {"id": "message-1", "email": "ann@example.com"},
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": datetime.utcnow(),
+            "locked_until": None,
+            "last_error": None,
+            "created_at": datetime.utcnow(),
+        })
+        await outbox.start()
+        try:
+            assert await wait_for(lambda: entry_status(outbox, "message-1:webhook", "delivered"))
+            await asyncio.sleep(0.2)
+            return (
+                await outbox.messages.find_one({"id": "message-1"}),
+                await outbox.collection.count_documents({}),
+            )
+        finally:
+            await outbox.drain(timeout=1)
+
+    message, entries = asyncio.run(run())
+
+    assert "pending_handlers" not in message
+    assert entries == 1
+    assert len(server.requests) == 1
@@ -0,0 +1,38 @@
+"""
+Period parsing behind the derived experience dates.
+
+Run from the repository root: python -m pytest tests
+"""
+
+from datetime import datetime
+
+import pytest
+
+from models import Experience, parse_period
+
+
+@pytest.mark.parametrize("period, expected", [
+    ("Feb 2021 - Nov 2024", (datetime(2021, 2, 1), datetime(2024, 11, 1))),
+    ("February 2021 - November 2024", (datetime(2021, 2, 1), datetime(2024, 11, 1))),
+    ("Sept. 2019 - Jan. 2021", (datetime(2019, 9, 1), datetime(2021, 1, 1))),
+    ("Sep 2019 – Jan 2021", (datetime(2019, 9, 1), datetime(2021, 1, 1))),
+    ("Sep 2019 — Jan 2021", (datetime(2019, 9, 1), datetime(2021, 1, 1))),
+    ("03/2018 to 07/2020", (datetime(2018, 3, 1), datetime(2020, 7, 1))),
+    ("2015 - 2017", (datetime(2015, 1, 1), datetime(2017, 1, 1))),
+    ("Nov 2024 - Present", (datetime(2024, 11, 1), None)),
+    ("Nov 2024 – current", (datetime(2024, 11, 1), None)),
+    ("Nov 2024", (datetime(2024, 11, 1), None)),
+    ("Sometime - Later", (None, None)),
+])
+def test_parse_period(period, expected):
+    assert parse_period(period) == expected
+
+
+def test_experience_derives_current_role_from_period():
+    current = Experience(company="A", role="Engineer", period="Nov 2024 - Present", location="Remote", achievements=[])
+    ended = Experience(company="B", role="Engineer", period="Nov 2024 - Dec 2024", location="Remote", achievements=[])
+    unparsed = Experience(company="C", role="Engineer", period="Nov 2024 - soon", location="Remote", achievements=[])
+
+    assert (current.end_date, current.is_current) == (None, True)
+    assert (ended.end_date, ended.is_current) == (datetime(2024, 12, 1), False)
+    assert (unparsed.end_date, unparsed.is_current) == (None, False)
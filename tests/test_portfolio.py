@@ -0,0 +1,132 @@
+"""
+Portfolio endpoints against mongomock-motor.
+
+Run from the repository root: python -m pytest tests
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import database
+from models import Experience, Project
+
+
+def experience(company, period):
+    return Experience(
+        id=company.lower(), company=company, role="Engineer", period=period,
+        location="Remote", achievements=[]
+    ).dict()
+
+
+def test_experience_lists_current_role_before_ended_role_with_same_start(api):
+    documents = [
+        experience("Ended", "Nov 2024 - Dec 2024"),
+        experience("Older", "Feb 2021 - Nov 2024"),
+        experience("Current", "Nov 2024 - Present"),
+    ]
+
+    async def run():
+        await database.experiences.insert_many(documents)
+        async with api() as client:
+            return await client.get("/api/portfolio/experience")
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert [entry["company"] for entry in response.json()] == ["Current", "Ended", "Older"]
+
+
+def project(title):
+    return Project(
+        id="project-1", title=title, description="Dialogflow CX migration",
+        technologies=["Dialogflow CX"], category="Conversational AI", status="Completed"
+    ).dict()
+
+
+async def store_version(updated_at):
+    await database.refresh_portfolio_stats()
+    await database.portfolio_meta.update_one(
+        {"_id": database.STATS_DOCUMENT_ID}, {"$set": {"updated_at": updated_at}}
+    )
+
+
+def test_last_modified_follows_data_version(api):
+    first = datetime(2024, 5, 1, 12, 0, 0, 500000)
+
+    async def run():
+        await database.projects.insert_one(project("Original"))
+        await store_version(first)
+        async with api() as client:
+            fresh = await client.get("/api/portfolio/projects")
+            last_modified = fresh.headers["Last-Modified"]
+            unchanged = await client.get(
+                "/api/portfolio/projects", headers={"If-Modified-Since": last_modified}
+            )
+
+            await database.projects.replace_one({"id": "project-1"}, project("Changed"))
+            await store_version(first + timedelta(seconds=10))
+            changed = await client.get(
+                "/api/portfolio/projects", headers={"If-Modified-Since": last_modified}
+            )
+
+            # Back to the first content, which must not bring back its old date
+            await database.projects.replace_one({"id": "project-1"}, project("Original"))
+            await store_version(first + timedelta(seconds=20))
+            reverted = await client.get(
+                "/api/portfolio/projects", headers={"If-Modified-Since": changed.headers["Last-Modified"]}
+            )
+        return fresh, unchanged, changed, reverted
+
+    fresh, unchanged, changed, reverted = asyncio.run(run())
+
+    assert fresh.headers["Last-Modified"] == "Wed, 01 May 2024 12:00:00 GMT"
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert changed.json()[0]["title"] == "Changed"
+    assert reverted.status_code == 200
+    assert reverted.json()[0]["title"] == "Original"
+    assert reverted.headers["Last-Modified"] == "Wed, 01 May 2024 12:00:20 GMT"
+
+
+def test_no_last_modified_before_the_seeder_stored_a_version(api):
+    async def run():
+        await database.projects.insert_one(project("Original"))
+        async with api() as client:
+            response = await client.get("/api/portfolio/projects")
+            conditional = await client.get(
+                "/api/portfolio/projects", headers={"If-Modified-Since": "Wed, 01 May 2024 12:00:00 GMT"}
+            )
+        return response, conditional
+
+    response, conditional = asyncio.run(run())
+
+    assert "Last-Modified" not in response.headers
+    assert "ETag" in response.headers
+    assert conditional.status_code == 200
+
+
+@pytest.mark.parametrize("fields", ["", ",", " , ", "title,bogus"])
+def test_projects_reject_empty_or_unknown_fields(api, fields):
+    async def run():
+        async with api() as client:
+            return (
+                await client.get("/api/portfolio/projects", params={"fields": fields}),
+                await client.get("/api/portfolio/bundle", params={"fields": fields}),
+            )
+
+    for response in asyncio.run(run()):
+        assert response.status_code == 400
+
+
+def test_projects_sparse_fieldset_keeps_id(api):
+    async def run():
+        await database.projects.insert_one(project("Original"))
+        async with api() as client:
+            return await client.get("/api/portfolio/projects", params={"fields": "title,"})
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": "project-1", "title": "Original"}]
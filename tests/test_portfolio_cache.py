@@ -0,0 +1,31 @@
+"""
+Portfolio caches against data written by another process (the seeder).
+
+Run from the repository root: python -m pytest tests
+"""
+
+import asyncio
+
+import seed_database
+
+
+def test_first_seed_after_startup_drops_cached_empty_responses(api):
+    async def run():
+        async with api() as client:
+            # Workers came up before the seeder, so the empty results are cached
+            response = await client.get("/api/portfolio/projects")
+            assert response.status_code == 200
+            assert response.json() == []
+            response = await client.get("/api/portfolio/search", params={"q": "dialogflow"})
+            assert response.json()["total"] == 0
+
+            await seed_database.seed_database()
+
+            projects = (await client.get("/api/portfolio/projects")).json()
+            search = (await client.get("/api/portfolio/search", params={"q": "dialogflow"})).json()
+            return projects, search
+
+    projects, search = asyncio.run(run())
+
+    assert len(projects) == len(seed_database.PROJECTS_DATA)
+    assert search["total"] > 0